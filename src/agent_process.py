@@ -0,0 +1,316 @@
+import multiprocessing
+import pickle
+import threading
+import queue
+import time
+import caro
+from minimax import SearchTimeout
+from ponder import Ponderer
+from typing import Callable, Any
+
+class AgentProcess:
+    """
+    Run an agent (caro.AI) in a persistent worker process, so a long search does not hold the GIL of
+    the caller (e.g. the GUI) and can be cancelled.
+
+    Requests and answers go through a pipe. request() returns at once, poll() returns the move when
+    the answer has arrived. cancel() and timeouts stop the search cooperatively (agent.stop(), see MiniMax):
+    the worker answers with the best move found so far. A worker that does not answer within grace
+    seconds after that is restarted.
+
+    If the agent has a stop() method, the worker can also ponder (see ponder.Ponderer): the answer
+    is ready at once when the opponent plays one of the predicted moves.
+
+    The agent is copied to the worker: changes made to the agent object after start are not seen by the worker.
+    An agent that can not be pickled (e.g. with a lambda as evaluate_function) runs in a thread of this
+    process instead (in_process = True): it still answers without blocking the caller, but shares its GIL,
+    and a worker that ignores stop() can not be killed.
+
+    Example:
+        process = AgentProcess(agent)
+        process.request(state, piece, timeout=10)
+        while (move := process.poll()) is None:
+            ...  # render, handle events
+        process.ponder(state_after_move, opponent_piece)
+        process.close()
+    """
+    def __init__(self, agent:caro.AI, on_answer:Callable[[], Any]|None=None, grace:float=2.0):
+        """
+        :param on_answer: called (from a background thread) when an answer arrives, e.g. to wake up an event loop
+        :param grace: seconds to wait for the answer after a cooperative stop, before restarting the worker
+        """
+        self.agent = agent
+        self.on_answer = on_answer
+        self.grace = grace if grace >= 0 else 0
+        self.answers = queue.Queue() # (request id, move) from the receiver thread
+        self.request_id = 0
+        self.pending = None # id of the request waiting for its answer, None => not busy
+        self.state = None # copy of the requested state
+        self.deadline = None # time.perf_counter() value, None => no timeout
+        self.cancelled_at = None # time.perf_counter() value of the cooperative stop
+        self._process = None
+        self._conn = None
+        self._receiver = None
+        self._send_lock = threading.Lock()
+        self.in_process = not _is_picklable(agent)
+        self.start()
+
+    def start(self):
+        """
+        Start the worker process or thread (called by __init__ and after close())
+        """
+        if self._process is not None:
+            return
+        if self.in_process:
+            parent_conn, child_conn = multiprocessing.Pipe()
+            self._process = threading.Thread(target=_agent_worker, args=(child_conn, self.agent), daemon=True)
+            self._process.start()
+        else:
+            # spawn: the worker does not inherit the threads and the SDL signal handlers of a pygame process
+            context = multiprocessing.get_context('spawn')
+            parent_conn, child_conn = context.Pipe()
+            self._process = context.Process(target=_agent_worker, args=(child_conn, self.agent), daemon=True)
+            self._process.start()
+            child_conn.close()
+        self._conn = parent_conn
+        self._receiver = threading.Thread(target=self._receive, args=[parent_conn], daemon=True)
+        self._receiver.start()
+
+    def _receive(self, conn):
+        while True:
+            try:
+                request_id, move = conn.recv()
+            except (EOFError, OSError):
+                return
+            self.answers.put((request_id, move))
+            if self.on_answer is not None:
+                self.on_answer()
+
+    def _send(self, message:tuple):
+        with self._send_lock:
+            self._conn.send(message)
+
+    def busy(self)->bool:
+        return self.pending is not None
+
+    def request(self, state:caro.BoardState, piece:str, timeout:float|None=None)->int:
+        """
+        Ask the worker for a move, the previous request is cancelled.
+        :param piece: piece of the agent, to move
+        :param timeout: seconds, the search is stopped after timeout. None => no timeout
+        :return: id of the request
+        """
+        if self.pending is not None:
+            self.cancel()
+        self.request_id += 1
+        self.pending = self.request_id
+        self.state = state.clone()
+        self.deadline = time.perf_counter() + timeout if timeout is not None else None
+        self.cancelled_at = None
+        self._send(('decide', self.request_id, self.state, piece))
+        return self.request_id
+
+    def poll(self)->tuple[int, int] | None:
+        """
+        Check for the answer of the pending request, and enforce its timeout.
+        :return: the move, None => no answer yet (or no pending request)
+        """
+        while True:
+            try:
+                request_id, move = self.answers.get_nowait()
+            except queue.Empty:
+                break
+            # answers of cancelled requests are dropped
+            if request_id == self.pending:
+                self.pending = None
+                return move
+        if self.pending is None:
+            return None
+
+        now = time.perf_counter()
+        if self.cancelled_at is None and self.deadline is not None and now >= self.deadline:
+            self.cancelled_at = now
+            self._send(('cancel', self.pending))
+        elif self.cancelled_at is not None and now - self.cancelled_at >= self.grace:
+            # the agent ignores stop() => restart the worker and play something legal
+            self.pending = None
+            self.close()
+            self.start()
+            return fallback_move(self.state)
+        return None
+
+    def result(self, timeout:float|None=None)->tuple[int, int] | None:
+        """
+        Wait for the answer of the pending request.
+        :param timeout: seconds, None => wait until the answer arrives
+        :return: the move, None => no answer after timeout
+        """
+        end = time.perf_counter() + timeout if timeout is not None else None
+        while self.pending is not None:
+            move = self.poll()
+            if move is not None:
+                return move
+            if end is not None and time.perf_counter() >= end:
+                return None
+            time.sleep(0.005)
+        return None
+
+    def cancel(self):
+        """
+        Stop the pending search, its answer is dropped
+        """
+        if self.pending is None:
+            return
+        self._send(('cancel', self.pending))
+        self.pending = None
+
+    def ponder(self, state:caro.BoardState, piece:str):
+        """
+        Let the worker search while the opponent thinks (nothing is done if the agent can not be stopped).
+        :param state: position after the agent's move
+        :param piece: opponent, to move
+        """
+        self._send(('ponder', state.clone(), piece))
+
+    def stop_pondering(self):
+        self._send(('stop ponder',))
+
+    def close(self):
+        """
+        Stop the worker process. start() starts a new one.
+        """
+        if self._process is None:
+            return
+        self.pending = None
+        try:
+            self._send(('close',))
+        except (OSError, ValueError):
+            pass
+        self._process.join(self.grace)
+        # a worker thread can not be killed: it is left to finish its search (daemon thread)
+        if not self.in_process and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(1.0)
+        if not self.in_process and self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
+        self._receiver = None
+
+def _is_picklable(agent:caro.AI)->bool:
+    try:
+        pickle.dumps(agent)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
+
+def fallback_move(state:caro.BoardState)->tuple[int, int]:
+    """
+    :return: a legal move, used when the agent has no answer: an empty cell next to the last move if possible
+    """
+    if state.last_move is not None:
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                r, c = state.last_move[0] + dr, state.last_move[1] + dc
+                if 0 <= r < caro.BOARD_SIZE and 0 <= c < caro.BOARD_SIZE and state.get((r, c)) == caro.EMPTY_CELL:
+                    return r, c
+    return state.get_empty_positions()[0]
+
+def one_ply_move(agent:caro.AI, state:caro.BoardState, piece:str)->tuple[int, int]:
+    """
+    Best move after one ply by the agent's evaluation (x maximizes it, o minimizes it), used when the search
+    is stopped before it finds a move.
+    :param piece: piece of the agent, to move
+    :return: the move, fallback_move(state) if the agent has no evaluation or no valid move
+    """
+    if not hasattr(agent, 'evaluate_function') or not hasattr(agent, 'find_valid_moves'):
+        return fallback_move(state)
+    opponent = caro.O_PIECE if piece == caro.X_PIECE else caro.X_PIECE
+    best_move, best_score = None, None
+    for move in agent.find_valid_moves(state):
+        state.put(piece, move)
+        score = agent.evaluate_function(state, opponent)
+        state.put(caro.EMPTY_CELL, move)
+        if piece == caro.O_PIECE:
+            score = -score
+        if best_score is None or score > best_score:
+            best_move, best_score = move, score
+    return best_move if best_move is not None else fallback_move(state)
+
+def _agent_worker(conn, agent:caro.AI):
+    """
+    Worker process: the main thread reads the requests, searches run in a second thread,
+    so a cancel request can stop the running search.
+    """
+    can_stop = hasattr(agent, 'stop')
+    ponderer = Ponderer(agent) if can_stop else None
+    pondered_hash = None # hash of the position the ponderer searched
+    send_lock = threading.Lock()
+    search = None # thread of the running search
+    running_id = None
+
+    def decide(request_id:int, state:caro.BoardState, piece:str):
+        move = None
+        # answer found while pondering => play it
+        if ponderer is not None and pondered_hash is not None and state.last_move is not None:
+            before = state.clone()
+            before.put(caro.EMPTY_CELL, state.last_move)
+            answer = ponderer.answer(state.last_move)
+            if before.hash == pondered_hash and answer is not None and state.get(answer) == caro.EMPTY_CELL:
+                move = answer
+        if move is None:
+            try:
+                # a stopped search may leave pieces on the board => search on a copy
+                move = agent.decide_move(state.clone(), piece)
+            except SearchTimeout:
+                move = None
+        # stopped before the first iteration finished => best move after one ply
+        if move is None:
+            move = one_ply_move(agent, state.clone(), piece)
+        with send_lock:
+            conn.send((request_id, (move[0], move[1])))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        kind = message[0]
+        if kind == 'decide':
+            _, request_id, state, piece = message
+            if ponderer is not None:
+                ponderer.stop()
+            if search is not None:
+                search.join()
+            if can_stop:
+                agent.stop_requested = False
+            running_id = request_id
+            search = threading.Thread(target=decide, args=[request_id, state, piece], daemon=True)
+            search.start()
+        elif kind == 'cancel':
+            if message[1] == running_id and can_stop and search is not None and search.is_alive():
+                agent.stop()
+        elif kind == 'ponder':
+            if ponderer is not None:
+                if search is not None:
+                    search.join()
+                ponderer.start(message[1], message[2])
+                pondered_hash = message[1].hash
+        elif kind == 'stop ponder':
+            if ponderer is not None:
+                ponderer.stop()
+        elif kind == 'close':
+            break
+
+    # clean up
+    if ponderer is not None:
+        ponderer.stop()
+    if search is not None:
+        if can_stop:
+            agent.stop()
+        search.join()
+    if hasattr(agent, 'close'):
+        agent.close()
+    conn.close()
@@ -1,11 +1,10 @@
 import os
 import sys
-import threading
-import queue
 import time
 import pygame
 import ui
 import caro
+from agent_process import AgentProcess
 from typing import Any, Callable
 
 # color
@@ -26,6 +25,14 @@ MOUSE_RIGHT = 3
 MOUSE_SCROLL_UP = 4
 MOUSE_SCROLL_DOWN = 5
 
+# posted when the move of an AI process is ready, wakes up the game loop
+AI_MOVE_EVENT = pygame.USEREVENT + 1
+
+def post_ai_move_event():
+    # called from the receiver thread of an AgentProcess
+    if pygame.display.get_init():
+        pygame.event.post(pygame.event.Event(AI_MOVE_EVENT))
+
 class AnimationBox(ui.Component):
     def __init__(
             self,
@@ -39,24 +46,43 @@ class AnimationBox(ui.Component):
             outer_surface:pygame.Surface|None=None
     ):
         super().__init__(rect, outer_surface)
-        self.avatar_gif = ui.Gif(
-            rect=(10, 10, self.width - 20, self.height - 20),
-            frames=ui.utils.gif_to_surfaces(gif_path),
-            frame_delay=frame_delay,
-            outer_surface=self.surface
-        )
+        self.gif_path = None
+        self.frame_delay = None
+        self.set_gif(gif_path, frame_delay)
         self.background = background
         self.border_color = border_color
         self.border_width = border_width if border_width >= 0 else 0
         self.border_radius = border_radius if border_radius >= 0 else 0
 
     def set_gif(self, gif_path, frame_delay:int=1):
+        """
+        Frames are taken from ui.FRAME_CACHE; setting the current gif again keeps the running animation.
+        """
+        if gif_path == self.gif_path and frame_delay == self.frame_delay:
+            return
+        self.gif_path = gif_path
+        self.frame_delay = frame_delay
         self.avatar_gif = ui.Gif(
             rect=(10, 10, self.width - 20, self.height - 20),
-            frames=ui.utils.gif_to_surfaces(gif_path),
+            frames=ui.FRAME_CACHE.get(gif_path, (self.width - 20, self.height - 20)),
             frame_delay=frame_delay,
             outer_surface=self.surface
         )
+        self.mark_dirty()
+
+    def set_background(self, background:tuple[int, int, int]|tuple[int, int, int, int]|list[int]):
+        if background != self.background:
+            self.background = background
+            self.mark_dirty()
+
+    def animate(self, now:int):
+        self.avatar_gif.animate(now)
+        if self.avatar_gif.dirty:
+            self.avatar_gif.dirty = False
+            self.mark_dirty()
+
+    def next_frame_at(self, now:int)->int|None:
+        return self.avatar_gif.next_frame_at(now)
 
     def render(self):
         pygame.draw.rect(self.surface, self.background, (0, 0, self.width, self.height), border_radius=self.border_radius)
@@ -70,12 +96,15 @@ class App:
             self,
             unit_size: int = 15,
             font_name: str | None = None,
-            player_avatar:dict[str, Any]|None=None
+            player_avatar:dict[str, Any]|None=None,
+            persist_gif_frames:bool=False
     ):
         """
 
         :param unit_size: Base unit size used for calculating screen and component sizes.
         :param font_name: The name of the font to use, selected from the 'assets/fonts' directory. If None, a default system font will be used.
+        :param persist_gif_frames: If True, the decoded and scaled avatar frames are saved in the 'cache' directory,
+            so the next runs start without decoding the GIFs.
         """
 
         '''
@@ -148,6 +177,7 @@ class App:
         self.running = False
         self.clock = pygame.time.Clock()
         self.fps = 60
+        self.agent_processes = [] # see get_agent_process()
 
         pygame.display.set_caption("CARO MASTER")
         '''
@@ -174,6 +204,8 @@ class App:
             border_radius=0
         )
 
+        if persist_gif_frames:
+            ui.FRAME_CACHE.cache_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cache', 'gif_frames'))
         self.player_x_avatar = AnimationBox(
             rect=ui.utils.generate_relative_rect(self.board.rect(), (10*u, 10*u), 'right', spacing=u),
             gif_path=App.get_asset_path("gifs", self.player_avatar['normal']['gif']),
@@ -194,6 +226,13 @@ class App:
             frame_delay=self.player_avatar['normal']['frame delay']
         )
 
+        # decode all avatar gifs once, changing the avatar is then a cache lookup
+        for avatar in self.player_avatar.values():
+            ui.FRAME_CACHE.get(
+                App.get_asset_path("gifs", avatar['gif']),
+                (self.player_x_avatar.width - 20, self.player_x_avatar.height - 20)
+            )
+
         self.player_o_name_box = ui.TextBox(
             rect=ui.utils.generate_relative_rect(self.player_o_avatar.rect(), (10 * u, 3 * u), "bottom", spacing=u),
             font=self.FONT_2U,
@@ -257,6 +296,22 @@ class App:
         asset_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'assets'))
         return os.path.join(asset_directory, *path)
 
+    def get_agent_process(self, agent:caro.AI)->AgentProcess:
+        """
+        :return: worker process of the agent, started on the first call for this agent
+        """
+        for process in self.agent_processes:
+            if process.agent is agent:
+                return process
+        process = AgentProcess(agent, on_answer=post_ai_move_event)
+        self.agent_processes.append(process)
+        return process
+
+    def close_agent_processes(self):
+        for process in self.agent_processes:
+            process.close()
+        self.agent_processes = []
+
     def reset_components(self):
         """
         reset: board, player name, player avatar, score, message box to default
@@ -278,14 +333,14 @@ class App:
         :param player_o_status: normal, thinking, win, loss
         """
         # player x
-        self.player_x_avatar.background = self.player_avatar[player_x_status]['background']
+        self.player_x_avatar.set_background(self.player_avatar[player_x_status]['background'])
         self.player_x_avatar.set_gif(
             App.get_asset_path("gifs", self.player_avatar[player_x_status]['gif']),
             self.player_avatar[player_x_status]['frame delay']
         )
 
         # player o
-        self.player_o_avatar.background = self.player_avatar[player_o_status]['background']
+        self.player_o_avatar.set_background(self.player_avatar[player_o_status]['background'])
         self.player_o_avatar.set_gif(
             App.get_asset_path("gifs", self.player_avatar[player_o_status]['gif']),
             self.player_avatar[player_o_status]['frame delay']
@@ -316,34 +371,30 @@ class App:
         highlight lastest move with background = green (if lastest move != None)
 
         highlight winning sequence: background = YELLOW(`if highlight_winning_sequence` == True)
-        """
-        self.board.clear()
-        for r in range(caro.BOARD_SIZE):
-            for c in range(caro.BOARD_SIZE):
-                self.board.put(
-                    piece=state.get((r, c)),
-                    position=(r, c),
-                    color=RED if state.get((r, c)) == caro.X_PIECE else BLUE,
-                    background=WHITE
-                )
 
+        The board is not cleared: only the cells whose piece or background changed since the last draw are repainted
+        """
+        background = dict()
         # highlight last move
         if lastest_move is not None:
-            self.board.put(
-                piece=state.get(lastest_move),
-                position=lastest_move,
-                color=RED if state.get(lastest_move) == caro.X_PIECE else BLUE,
-                background=GREEN
-            )
+            background[(lastest_move[0], lastest_move[1])] = GREEN
+
+        # highlight winning sequence, the cached status avoids a full board scan while the game is not finished
+        if highlight_winning_sequence and (state.status() == caro.X_WIN or state.status() == caro.O_WIN):
+            sequence = state.get_winning_sequence_at(lastest_move) if lastest_move is not None else []
+            if len(sequence) == 0:
+                sequence = state.get_winning_sequence()
+            for p in sequence:
+                background[p] = YELLOW
 
-        # highlight winning sequence
-        if highlight_winning_sequence:
-            for p in state.get_winning_sequence():
+        for r in range(caro.BOARD_SIZE):
+            for c in range(caro.BOARD_SIZE):
+                piece = state.get((r, c))
                 self.board.put(
-                    piece=state.get(p),
-                    position=p,
-                    color=RED if state.get(p) == caro.X_PIECE else BLUE,
-                    background=YELLOW
+                    piece=piece,
+                    position=(r, c),
+                    color=RED if piece == caro.X_PIECE else BLUE,
+                    background=background.get((r, c), WHITE)
                 )
 
     def play_n_game(
@@ -353,8 +404,14 @@ class App:
             first_turn: str,
             number_of_game:int=1,
             review_game_after_finish: bool = True,
-            allow_take_back_move: bool = True
+            allow_take_back_move: bool = True,
+            ponder: bool = False,
+            ai_timeout: float | None = None
     )->list[caro.GameRecord]:
+        """
+        :param ponder: see play()
+        :param ai_timeout: see play()
+        """
         self.reset_components()
         game_records = []
         score = [0, 0]
@@ -370,7 +427,9 @@ class App:
                 player_o=player_o,
                 first_turn=first_turn,
                 review_game_after_finish=False,
-                allow_take_back_move=allow_take_back_move
+                allow_take_back_move=allow_take_back_move,
+                ponder=ponder,
+                ai_timeout=ai_timeout
             )
             game_records.append(record)
 
@@ -401,8 +460,18 @@ class App:
             player_o:caro.Human|caro.AI,
             first_turn: str,
             review_game_after_finish: bool = True,
-            allow_take_back_move: bool= True
+            allow_take_back_move: bool= True,
+            ponder: bool = False,
+            ai_timeout: float | None = None
         )-> caro.GameRecord:
+        """
+        AI players run in worker processes (see agent_process.AgentProcess), kept by the app for the next games.
+
+        :param ponder: if True and an AI (MiniMax) plays against a human, the AI searches its answers
+            to the human's likely moves while the human thinks (see ponder.Ponderer)
+        :param ai_timeout: seconds, an AI search is stopped after ai_timeout and its best move so far is played.
+            None => no timeout
+        """
         if not(isinstance(player_x, (caro.Human, caro.AI)) or isinstance(player_o, (caro.Human, caro.AI))):
             print(f"player x is instance of {type(player_x)}")
             print(f"player o is instance of {type(player_o)}")
@@ -422,12 +491,18 @@ class App:
         else:
             self.set_player_avatar('normal', 'thinking')
 
-        # function to call in thread to let AI decide move
-        ai_calc_result = queue.Queue()
-        ai_is_thinking = False
-        def let_ai_decide_move(state:caro.BoardState, ai:caro.AI, piece:str):
-            m = ai.decide_move(state, piece)
-            ai_calc_result.put(m)
+        # AI decides moves in its worker process, the game loop keeps rendering
+        processes = dict()
+        for piece in (caro.X_PIECE, caro.O_PIECE):
+            if isinstance(player[piece], caro.AI):
+                processes[piece] = self.get_agent_process(player[piece])
+
+        # pondering: AI searches while the human thinks (in its worker process)
+        pondering = None
+        if ponder:
+            for piece, other in ((caro.X_PIECE, caro.O_PIECE), (caro.O_PIECE, caro.X_PIECE)):
+                if hasattr(player[piece], 'stop') and isinstance(player[other], caro.Human):
+                    pondering = processes[piece]
 
         # function to make move
         def make_move(move:tuple[int, int]):
@@ -448,11 +523,16 @@ class App:
             status = board_state.status()
             if status != caro.NOT_FINISH:
                 self.running = False
+            # AI moved => ponder on the human's time
+            elif pondering is not None and isinstance(player[current_turn], caro.Human):
+                pondering.ponder(board_state, current_turn)
 
         # function to take back move
         def takeback():
             if len(game_record.moves) < 2:
                 return
+            if pondering is not None:
+                pondering.stop_pondering()
             board_state.put(caro.EMPTY_CELL, game_record.moves[-1])
             game_record.remove_last_move()
 
@@ -461,6 +541,8 @@ class App:
 
             if len(game_record.moves) != 0:
                 self.draw_board(board_state, game_record.moves[-1])
+                if pondering is not None:
+                    pondering.ponder(board_state, current_turn)
             else:
                 self.draw_board(board_state)
 
@@ -484,6 +566,7 @@ class App:
 
         if allow_take_back_move:
             components.append(self.takeback_btn)
+        scheduler = ui.RenderScheduler(components, background=WHITE)
         self.running = True
 
         while self.running:
@@ -493,28 +576,27 @@ class App:
             ---------------------------------------------
             '''
             if isinstance(player[current_turn], caro.AI):
-                # not create thread => create thread
-                if not ai_is_thinking:
-                    # calculating in new thread
-                    ai_is_thinking = True
-                    # Use board.clone() to ensure AI works on a copy and doesn't modify the real game state
-                    t = threading.Thread(target=let_ai_decide_move, args=[board_state.clone(), player[current_turn], current_turn])
-                    t.start()
-                # thread completed => update
-                elif not ai_calc_result.empty():
-                    ai_is_thinking = False
-                    make_move(ai_calc_result.get())
+                process = processes[current_turn]
+                # no request => send the position (the worker plays its pondered answer if it has one)
+                if not process.busy():
+                    process.request(board_state, current_turn, timeout=ai_timeout)
+                # answer arrived => update
+                else:
+                    move = process.poll()
+                    if move is not None:
+                        make_move(move)
             '''
             ------------------------------------------------
                 HANDLE EVENT: human move, take back, ...
             ------------------------------------------------
             '''
-            for event in pygame.event.get():
+            for event in scheduler.wait_events():
 
                 for c in components:
                     c.handle_event(event)
 
                 if event.type == pygame.QUIT:
+                    self.close_agent_processes()
                     pygame.display.quit()
                     sys.exit(0)
 
@@ -532,12 +614,13 @@ class App:
                                 RENDER
             -------------------------------------------------
             '''
-            self.screen.fill(WHITE)
-            for c in components:
-                c.render()
-            pygame.display.update()
+            scheduler.draw()
             self.clock.tick(self.fps)
         # end game loop
+        if pondering is not None:
+            pondering.stop_pondering()
+        for process in processes.values():
+            process.cancel()
 
         if review_game_after_finish and len(game_record.moves) != 0:
             self.review_game(game_record)
@@ -545,6 +628,9 @@ class App:
 
 
     def review_game(self, game_record:caro.GameRecord):
+        """
+        Step through a game: prev/next buttons or Left/Right keys, Home/End => first/last move
+        """
         if len(game_record.moves) == 0:
             raise RuntimeError("Game record contains no moves!")
 
@@ -566,8 +652,13 @@ class App:
         elif game_result == caro.NOT_FINISH:
             self.set_message("Game review mode\nGame not finish")
 
-        move_id = len(game_record.moves) - 1
-        self.draw_board(caro.BoardState.from_moves(game_record.moves[:move_id + 1:], game_record.first_turn), lastest_move=game_record.moves[move_id])
+        # board after the shown move, stepping puts or removes one move
+        cursor = caro.ReplayCursor(game_record)
+        def show(ply:int):
+            # the first move stays on the board
+            cursor.seek(min(max(ply, 1), len(cursor)))
+            self.draw_board(cursor.state, lastest_move=cursor.last_move())
+        show(len(cursor))
 
         components = [
             self.board,
@@ -582,6 +673,7 @@ class App:
             self.next_btn,
             self.continue_btn
         ]
+        scheduler = ui.RenderScheduler(components, background=WHITE)
         self.running = True
         while self.running:
             '''
@@ -589,7 +681,7 @@ class App:
                 HANDLE EVENT
             -------------------------
             '''
-            for event in pygame.event.get():
+            for event in scheduler.wait_events():
                 for c in components:
                     c.handle_event(event)
                 if event.type == pygame.QUIT:
@@ -598,34 +690,28 @@ class App:
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == MOUSE_LEFT:
                     pos = pygame.mouse.get_pos()
                     if self.prev_btn.contain_coordinate(pos):
-                        if move_id > 0:
-                            move_id -= 1
-                            self.draw_board(caro.BoardState.from_moves(game_record.moves[:move_id + 1:], game_record.first_turn), lastest_move=game_record.moves[move_id])
+                        show(cursor.ply - 1)
                     elif self.next_btn.contain_coordinate(pos):
-                        if move_id != len(game_record.moves)-1:
-                            move_id += 1
-                            self.draw_board(caro.BoardState.from_moves(game_record.moves[:move_id + 1:], game_record.first_turn), lastest_move=game_record.moves[move_id])
+                        show(cursor.ply + 1)
                     elif self.continue_btn.contain_coordinate(pos):
                         self.running = False
                         break
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_LEFT:
-                        if move_id > 0:
-                            move_id -= 1
-                            self.draw_board(caro.BoardState.from_moves(game_record.moves[:move_id + 1:], game_record.first_turn), lastest_move=game_record.moves[move_id])
+                        show(cursor.ply - 1)
                     elif event.key == pygame.K_RIGHT:
-                        if move_id != len(game_record.moves) - 1:
-                            move_id += 1
-                            self.draw_board(caro.BoardState.from_moves(game_record.moves[:move_id + 1:], game_record.first_turn), lastest_move=game_record.moves[move_id])
+                        show(cursor.ply + 1)
+                    # jump to the first / last move
+                    elif event.key == pygame.K_HOME:
+                        show(1)
+                    elif event.key == pygame.K_END:
+                        show(len(cursor))
             '''
             ---------------------------
                         RENDER
             ---------------------------
             '''
-            self.screen.fill(WHITE)
-            for c in components:
-                c.render()
-            pygame.display.update()
+            scheduler.draw()
             self.clock.tick(self.fps)
 
         # end game loop
@@ -682,20 +768,20 @@ class App:
             change_piece_btn,
             call_func_btn
         ]
+        scheduler = ui.RenderScheduler(components, background=WHITE)
         self.running = True
-        # calculating fps
+        # calculating fps (screen updates per second)
         t = time.time()
         count = 0
         while self.running:
             # fps
-            count += 1
             if time.time() - t >= 1.0:
                 avg_fps = count / (time.time() - t)
                 t = time.time()
                 count = 0
                 self.fps_box.set_text(f'{avg_fps:.02f} fps')
 
-            for event in pygame.event.get():
+            for event in scheduler.wait_events():
                 if event.type == pygame.QUIT:
                     pygame.display.quit()
                     sys.exit(0)
@@ -714,10 +800,8 @@ class App:
                 for c in components:
                     c.handle_event(event)
 
-            self.screen.fill((255, 255, 255))
-            for c in components:
-                c.render()
-            pygame.display.update()
+            if len(scheduler.draw()) != 0:
+                count += 1
             self.clock.tick(self.fps)
         self.reset_components()
 
@@ -746,20 +830,19 @@ class App:
             self.continue_btn
         ]
 
+        scheduler = ui.RenderScheduler(components, background=WHITE)
         self.running = True
-
-        # calculating fps
+        # calculating fps (screen updates per second)
         t = time.time()
         count = 0
         while self.running:
             # fps
-            count += 1
             if time.time() - t >= 1.0:
                 avg_fps = count / (time.time() - t)
                 t = time.time()
                 count = 0
                 self.fps_box.set_text(f'{avg_fps:.02f} fps')
-            for event in pygame.event.get():
+            for event in scheduler.wait_events():
                 if event.type == pygame.QUIT:
                     pygame.display.quit()
                     sys.exit(0)
@@ -767,10 +850,8 @@ class App:
                 for c in components:
                     c.handle_event(event)
 
-            self.screen.fill((255, 255, 255))
-            for c in components:
-                c.render()
-            pygame.display.update()
+            if len(scheduler.draw()) != 0:
+                count += 1
 
             self.clock.tick(self.fps)
 
@@ -0,0 +1,11 @@
+"""
+Benchmark suite of the engine components: board operations, evaluate, find_valid_moves and full decisions.
+
+Run from the src directory:
+    python -m benchmark run --output results.json
+    python -m benchmark compare base.json results.json
+    python -m benchmark components
+"""
+from .corpus import Position, OPENING, MIDDLEGAME, TACTICAL, standard_corpus, random_positions, load_corpus
+from .harness import measure, time_board_ops, time_evaluate, time_find_valid_moves, time_decisions, run_suite
+from .report import make_report, save_report, load_report, compare, print_report, print_comparison
@@ -0,0 +1,51 @@
+import argparse
+import sys
+from .corpus import standard_corpus, load_corpus
+from .harness import run_suite
+from .report import make_report, save_report, load_report, compare, print_report, print_comparison
+from . import components
+
+def main()->int:
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description="Benchmarks of the caro engine")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="time the engine components on the position corpus")
+    run.add_argument('--output', help="save the results to this JSON file")
+    run.add_argument('--max-depth', type=int, default=4, help="decisions are timed at depth 1 ... max depth")
+    run.add_argument('--repeat', type=int, default=3, help="runs of each component benchmark (best time is kept)")
+    run.add_argument('--corpus', nargs='*', default=[],
+                     help="game record files, the position before the last move of each game is added")
+    run.add_argument('--no-standard', action='store_true', help="do not use the standard corpus")
+
+    cmp = commands.add_parser('compare', help="compare two saved runs")
+    cmp.add_argument('base')
+    cmp.add_argument('new')
+    cmp.add_argument('--threshold', type=float, default=0.1, help="flag slowdowns above this fraction")
+
+    commands.add_parser('components', help="compare alternative implementations (boards, orderings, search modes)")
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        positions = [] if args.no_standard else standard_corpus()
+        for path in args.corpus:
+            positions += load_corpus(path)
+        if len(positions) == 0:
+            print("No positions")
+            return 1
+        report = make_report(run_suite(positions, list(range(1, args.max_depth + 1)), args.repeat), len(positions))
+        print_report(report)
+        if args.output is not None:
+            save_report(args.output, report)
+        return 0
+
+    if args.command == 'compare':
+        rows = compare(load_report(args.base), load_report(args.new), args.threshold)
+        print_comparison(rows)
+        # non zero exit code if something is slower, so scripts can check it
+        return 1 if any(r['slower'] for r in rows) else 0
+
+    components.main()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
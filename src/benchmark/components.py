@@ -0,0 +1,89 @@
+"""
+Comparisons between alternative implementations of the same component.
+"""
+import caro
+from evaluate import evaluate
+from minimax import MiniMax
+from move_ordering import HeuristicOrdering
+from .corpus import Position, OPENING, MIDDLEGAME, random_positions
+from .harness import time_board_ops, time_decisions
+
+def compare_board_classes(positions:list[Position], board_classes:list, repeat:int=3)->dict[str, dict[str, float]]:
+    """
+    time_board_ops of each board class.
+    :return: dict[class name, dict[operation name, seconds]]
+    """
+    result = {}
+    for board_class in board_classes:
+        prefix = f"board/{board_class.__name__}/"
+        times = time_board_ops(positions, board_class, repeat)
+        result[board_class.__name__] = {name[len(prefix):]: r['time'] for name, r in times.items()}
+    return result
+
+def compare_agents(
+        configs:dict[str, dict],
+        positions:list[Position],
+        depth:int
+)->dict[str, dict[str, float]]:
+    """
+    time_decisions of a MiniMax agent for each configuration, e.g. move orderings or search modes.
+    :param configs: dict[name, MiniMax keyword arguments added to the common ones]
+    :return: dict[name, {'nodes': total node count, 'time': seconds}]
+    """
+    result = {}
+    for name, kwargs in configs.items():
+        def make_agent(d:int)->MiniMax:
+            return MiniMax(name=name, depth=d, search_radius=1, random_move=0, evaluate_function=evaluate, **kwargs)
+        decisions = time_decisions(positions, [depth], make_agent)
+        result[name] = {
+            'nodes': sum(r['nodes'] for r in decisions.values()),
+            'time': sum(r['time'] for r in decisions.values())
+        }
+    return result
+
+def print_agents(title:str, results:dict[str, dict[str, float]], base:str):
+    print(f"\n{title}")
+    print("-" * 72)
+    print(f"|{'Agent':<30}{'nodes':>14}{'time':>14}{'nodes ratio':>13}|")
+    print("-" * 72)
+    base_nodes = results[base]['nodes']
+    for name, r in results.items():
+        print(f"|{name:<30}{r['nodes']:>14}{r['time']:>13.03f}s{base_nodes / r['nodes']:>12.02f}x|")
+    print("-" * 72)
+
+def main():
+    """
+    Print the component comparisons: BoardState vs BitBoardState, move orderings and search modes
+    """
+    positions = random_positions(MIDDLEGAME, 50, 40, radius=caro.BOARD_SIZE // 2, seed=0)
+    results = compare_board_classes(positions, [caro.BoardState, caro.BitBoardState])
+
+    operations = list(results[caro.BoardState.__name__].keys())
+    print(f"{len(positions)} positions x {len(positions[0].moves)} moves")
+    print("-" * 72)
+    print(f"|{'Operation':<20}" + ''.join(f"{name:>16}" for name in results) + f"{'speedup':>14}|")
+    print("-" * 72)
+    for op in operations:
+        base = results[caro.BoardState.__name__][op]
+        bit = results[caro.BitBoardState.__name__][op]
+        print(f"|{op:<20}" + ''.join(f"{results[name][op]:>15.04f}s" for name in results) + f"{base/bit:>13.02f}x|")
+    print("-" * 72)
+
+    depth = 3
+    openings = random_positions(OPENING, 5, 8, radius=3, seed=0)
+    orderings = {
+        'no ordering': {},
+        'threats': {'move_ordering': HeuristicOrdering(killers=False, history=False)},
+        'killers + history': {'move_ordering': HeuristicOrdering(threats=False)},
+        'threats + killers + history': {'move_ordering': HeuristicOrdering()}
+    }
+    print_agents(f"Move ordering, minimax depth {depth}", compare_agents(orderings, openings, depth), 'no ordering')
+
+    table_size = 1 << 16
+    search_modes = {
+        'alpha-beta': {'transposition_table_size': table_size, 'move_ordering': HeuristicOrdering()},
+        'pvs': {'transposition_table_size': table_size, 'move_ordering': HeuristicOrdering(), 'search_mode': 'pvs'},
+        'pvs + aspiration': {'transposition_table_size': table_size, 'move_ordering': HeuristicOrdering(),
+                             'search_mode': 'pvs', 'aspiration_window': 1000}
+    }
+    print_agents(f"Search mode, minimax depth {depth}", compare_agents(search_modes, openings, depth), 'alpha-beta')
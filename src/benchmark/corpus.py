@@ -0,0 +1,95 @@
+import os
+import random
+import caro
+
+OPENING = 'opening'
+MIDDLEGAME = 'middlegame'
+TACTICAL = 'tactical'
+
+class Position:
+    """
+    A benchmark position: the moves played from an empty board.
+    """
+    def __init__(self, name:str, category:str, moves:list[tuple[int, int]], first_turn:str=caro.X_PIECE):
+        self.name = name
+        self.category = category
+        self.moves = [(m[0], m[1]) for m in moves]
+        self.first_turn = first_turn
+
+    @property
+    def current_turn(self)->str:
+        second_turn = caro.O_PIECE if self.first_turn == caro.X_PIECE else caro.X_PIECE
+        return self.first_turn if len(self.moves) % 2 == 0 else second_turn
+
+    def state(self, board_class=caro.BoardState):
+        """
+        :param board_class: caro.BoardState or caro.BitBoardState
+        """
+        return board_class.from_moves(self.moves, self.first_turn)
+
+    def __repr__(self):
+        return f"Position({self.name!r}, {self.category!r}, {len(self.moves)} moves)"
+
+# hand made positions where the move to play is forced, x plays first and is to move
+TACTICAL_MOVES = {
+    # x has an open four => win
+    'win four': [(7, 5), (8, 5), (7, 6), (8, 6), (7, 7), (9, 9), (7, 8), (10, 10)],
+    # o has a four => block at (7, 9)
+    'block four': [(7, 4), (7, 5), (3, 3), (7, 6), (11, 11), (7, 7), (3, 11), (7, 8)],
+    # o has an open three => block one end
+    'block open three': [(2, 2), (6, 6), (12, 12), (6, 7), (2, 12), (6, 8)],
+    # x wins by continuous fours (7 moves)
+    'vcf 1': [(4, 8), (8, 6), (10, 5), (6, 8), (4, 6), (9, 8), (9, 9), (9, 10), (5, 9), (10, 10), (9, 7), (5, 6),
+              (7, 4), (6, 6), (6, 9), (5, 5), (4, 4), (10, 9)],
+    'vcf 2': [(7, 5), (5, 4), (5, 6), (6, 5), (5, 9), (4, 6), (9, 4), (10, 5), (6, 10), (10, 9), (7, 7), (8, 5),
+              (10, 4), (6, 9), (7, 9), (9, 5), (10, 7), (7, 10)]
+}
+
+def random_positions(
+        category:str,
+        n_position:int,
+        n_moves:int,
+        radius:int,
+        seed:int
+)->list[Position]:
+    """
+    Unfinished positions with n_moves random moves within `radius` of the center of the board.
+    Only depends on `seed` (not on the engine), so the corpus stays the same between runs.
+    """
+    rng = random.Random(seed)
+    center = caro.BOARD_SIZE // 2
+    cells = [(r, c) for r in range(center - radius, center + radius + 1) for c in range(center - radius, center + radius + 1)]
+    positions = []
+    while len(positions) < n_position:
+        moves = rng.sample(cells, n_moves)
+        if caro.BoardState.from_moves(moves, caro.X_PIECE).status() != caro.NOT_FINISH:
+            continue
+        positions.append(Position(f"{category} {len(positions) + 1}", category, moves))
+    return positions
+
+def standard_corpus()->list[Position]:
+    """
+    :return: fixed corpus: 8 opening, 8 middlegame and the tactical positions
+    """
+    positions = random_positions(OPENING, 8, 6, radius=3, seed=1)
+    positions += random_positions(MIDDLEGAME, 8, 24, radius=5, seed=2)
+    positions += [Position(name, TACTICAL, moves) for name, moves in TACTICAL_MOVES.items()]
+    return positions
+
+def load_corpus(path, category:str|None=None, plies:list[int]|None=None)->list[Position]:
+    """
+    Positions taken from a game record file (any format of caro.GameRecord.iter_file).
+    :param category: category of the positions, None => file name
+    :param plies: take the position after each of these numbers of moves (if the game is long enough),
+        None => the position before the last move of each game
+    """
+    if category is None:
+        category = os.path.basename(str(path))
+    positions = []
+    for i, record in enumerate(caro.GameRecord.iter_file(path)):
+        lengths = [len(record.moves) - 1] if plies is None else [n for n in plies if n < len(record.moves)]
+        for n in lengths:
+            if n < 0:
+                continue
+            positions.append(Position(f"{category} game {i + 1} ply {n}", category, record.moves[:n], record.first_turn))
+    return positions
@@ -0,0 +1,184 @@
+"""
+Timing harnesses. Each one returns dict[benchmark name, {'time': seconds, ...}] so the results of
+all harnesses can be merged, saved as JSON and compared (see benchmark.report).
+"""
+import random
+import time
+from typing import Callable
+import caro
+from evaluate import evaluate
+from minimax import MiniMax
+from move_ordering import HeuristicOrdering
+from .corpus import Position
+
+def measure(function:Callable[[], None], repeat:int=3, number:int=10)->float:
+    """
+    :return: best time of `repeat` runs of `number` calls, in seconds
+    """
+    best = float('inf')
+    for _ in range(max(repeat, 1)):
+        t = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+def other_piece(piece:str)->str:
+    return caro.O_PIECE if piece == caro.X_PIECE else caro.X_PIECE
+
+def time_board_ops(positions:list[Position], board_class=caro.BoardState, repeat:int=3)->dict[str, dict[str, float]]:
+    """
+    put, get, clone, status and put/status/undo (the pattern of the search) on every position.
+    """
+    prefix = f"board/{board_class.__name__}/"
+    states = [p.state(board_class) for p in positions]
+
+    def put():
+        for p in positions:
+            state = board_class()
+            piece = p.first_turn
+            for m in p.moves:
+                state.put(piece, m)
+                piece = other_piece(piece)
+
+    def get():
+        for state in states:
+            for r in range(caro.BOARD_SIZE):
+                for c in range(caro.BOARD_SIZE):
+                    state.get((r, c))
+
+    def clone():
+        for state in states:
+            for _ in range(10):
+                state.clone()
+
+    def status():
+        # drop the cached status so the whole board is checked
+        for state in states:
+            state.reset_status()
+            state.status()
+
+    def put_status_undo():
+        for p, state in zip(positions, states):
+            for m in state.get_empty_positions():
+                state.put(p.current_turn, m)
+                state.status()
+                state.put(caro.EMPTY_CELL, m)
+
+    return {
+        prefix + 'put': {'time': measure(put, repeat)},
+        prefix + 'get': {'time': measure(get, repeat)},
+        prefix + 'clone x10': {'time': measure(clone, repeat)},
+        prefix + 'status full scan': {'time': measure(status, repeat)},
+        prefix + 'put/status/undo': {'time': measure(put_status_undo, repeat)}
+    }
+
+def time_evaluate(
+        positions:list[Position],
+        evaluate_function:Callable[[caro.BoardState, str], float | int]=evaluate,
+        repeat:int=3
+)->dict[str, dict[str, float]]:
+    """
+    evaluate on a new state (caches are built, the time includes building the state)
+    and after each move within distance 1 (caches are updated).
+    """
+    def first_call():
+        for p in positions:
+            evaluate_function(p.state(), p.current_turn)
+
+    states = [p.state() for p in positions]
+    for p, state in zip(positions, states):
+        evaluate_function(state, p.current_turn)
+
+    def incremental():
+        for p, state in zip(positions, states):
+            for m in caro.CandidateMoves.of(state, 1).moves.copy():
+                state.put(p.current_turn, m)
+                evaluate_function(state, other_piece(p.current_turn))
+                state.put(caro.EMPTY_CELL, m)
+
+    return {
+        'evaluate/first call': {'time': measure(first_call, repeat)},
+        'evaluate/put/evaluate/undo': {'time': measure(incremental, repeat)}
+    }
+
+def time_find_valid_moves(positions:list[Position], search_radius:int=2, repeat:int=3)->dict[str, dict[str, float]]:
+    """
+    MiniMax.find_valid_moves on a new state (the time includes building the state)
+    and after each candidate move (candidates are updated).
+    """
+    agent = MiniMax('benchmark', depth=1, search_radius=search_radius, random_move=0, evaluate_function=evaluate)
+
+    def first_call():
+        for p in positions:
+            agent.find_valid_moves(p.state())
+
+    states = [p.state() for p in positions]
+    def incremental():
+        for p, state in zip(positions, states):
+            for m in agent.find_valid_moves(state):
+                state.put(p.current_turn, m)
+                agent.find_valid_moves(state)
+                state.put(caro.EMPTY_CELL, m)
+
+    return {
+        f'find_valid_moves/radius {search_radius}/first call': {'time': measure(first_call, repeat)},
+        f'find_valid_moves/radius {search_radius}/put/find/undo': {'time': measure(incremental, repeat)}
+    }
+
+def default_agent(depth:int)->MiniMax:
+    """
+    Search configuration of the decision benchmarks
+    """
+    return MiniMax(
+        name=f"minimax depth {depth}", depth=depth, search_radius=1, random_move=0, evaluate_function=evaluate,
+        transposition_table_size=1 << 16, move_ordering=HeuristicOrdering()
+    )
+
+def time_decisions(
+        positions:list[Position],
+        depths:list[int],
+        make_agent:Callable[[int], MiniMax]=default_agent
+)->dict[str, dict[str, float]]:
+    """
+    One decide_move per position, with a new agent for each depth and category.
+    Positions are timed once: a decision is long enough to be measured and node counts are exact.
+    :return: per category and depth: {'time': seconds, 'nodes': total node count}
+    """
+    result = dict()
+    categories = []
+    for p in positions:
+        if p.category not in categories:
+            categories.append(p.category)
+    for depth in depths:
+        for category in categories:
+            agent = make_agent(depth)
+            nodes = 0
+            total = 0.0
+            for p in positions:
+                if p.category != category:
+                    continue
+                state = p.state()
+                if state.status() != caro.NOT_FINISH:
+                    continue
+                random.seed(0)
+                t = time.perf_counter()
+                agent.decide_move(state, p.current_turn)
+                total += time.perf_counter() - t
+                nodes += agent.node_count
+            result[f"decide/depth {depth}/{category}"] = {'time': total, 'nodes': nodes}
+            agent.close()
+    return result
+
+def run_suite(positions:list[Position], depths:list[int], repeat:int=3)->dict[str, dict[str, float]]:
+    """
+    All harnesses on the given positions
+    """
+    result = dict()
+    for board_class in (caro.BoardState, caro.BitBoardState):
+        result.update(time_board_ops(positions, board_class, repeat))
+    result.update(time_evaluate(positions, repeat=repeat))
+    for radius in (1, 2):
+        result.update(time_find_valid_moves(positions, radius, repeat))
+    result.update(time_decisions(positions, depths))
+    return result
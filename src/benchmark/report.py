@@ -0,0 +1,71 @@
+import json
+import platform
+import time
+from typing import Any
+
+def make_report(results:dict[str, dict[str, float]], n_position:int)->dict[str, Any]:
+    """
+    :param results: output of the harnesses
+    :return: results with the information needed to interpret them
+    """
+    return {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'positions': n_position,
+        'results': results
+    }
+
+def save_report(path, report:dict[str, Any]):
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=4)
+
+def load_report(path)->dict[str, Any]:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+def compare(base:dict[str, Any], new:dict[str, Any], threshold:float=0.1)->list[dict[str, Any]]:
+    """
+    Compare two reports, benchmark by benchmark.
+    :param threshold: a benchmark is flagged as slower if its time grows by more than this fraction
+    :return: list of {'name', 'base', 'new', 'ratio' (new time / base time), 'slower', 'nodes changed'},
+        for the benchmarks present in both reports
+    """
+    rows = []
+    for name, b in base['results'].items():
+        if name not in new['results']:
+            continue
+        n = new['results'][name]
+        ratio = n['time'] / b['time'] if b['time'] > 0 else 1.0
+        rows.append({
+            'name': name,
+            'base': b['time'],
+            'new': n['time'],
+            'ratio': ratio,
+            'slower': ratio > 1 + threshold,
+            # a different node count means the search itself changed, not only its speed
+            'nodes changed': b.get('nodes') != n.get('nodes')
+        })
+    return rows
+
+def print_report(report:dict[str, Any]):
+    print(f"{report['date']}, python {report['python']}, {report['positions']} positions")
+    print("-" * 84)
+    print(f"|{'Benchmark':<56}{'time':>14}{'nodes':>12}|")
+    print("-" * 84)
+    for name, r in report['results'].items():
+        nodes = str(r['nodes']) if 'nodes' in r else ''
+        print(f"|{name:<56}{r['time']:>13.04f}s{nodes:>12}|")
+    print("-" * 84)
+
+def print_comparison(rows:list[dict[str, Any]]):
+    print("-" * 96)
+    print(f"|{'Benchmark':<56}{'base':>11}{'new':>11}{'ratio':>9}{'':>8}|")
+    print("-" * 96)
+    for r in rows:
+        flag = 'SLOWER' if r['slower'] else ''
+        if r['nodes changed']:
+            flag += '*'
+        print(f"|{r['name']:<56}{r['base']:>10.04f}s{r['new']:>10.04f}s{r['ratio']:>8.02f}x{flag:>8}|")
+    print("-" * 96)
+    print("* node count changed")
@@ -29,6 +29,11 @@ if not ('caro_module_intro' in os.environ):
     os.environ['caro_module_intro'] = 'x'
 
 from .constants import *
+from .base_board_state import BaseBoardState
 from .board_state import BoardState
-from .game_record import GameRecord
+from .bit_board_state import BitBoardState
+from .zobrist import ZOBRIST_KEYS, ZOBRIST_TURN_KEYS
+from .candidate_moves import CandidateMoves
+from .game_record import GameRecord, GameRecordWriter
+from .replay_cursor import ReplayCursor
 from .player import Player, Human, AI
\ No newline at end of file
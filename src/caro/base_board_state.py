@@ -0,0 +1,213 @@
+from .constants import *
+from .zobrist import ZOBRIST_KEYS
+
+class BaseBoardState:
+    """
+    Logic shared by the board representations (BoardState, BitBoardState): last_move, empty_count,
+    the cached status, the zobrist hash and the listeners are kept up to date by put(),
+    so status() only has to check the lines through the last move.
+
+    Subclasses store the cells and implement:
+        - get(), to_cells(), get_empty_positions()
+        - _write(): store a piece, without any other update
+        - _clear_cells(), _copy_cells()
+        - check_win_at_position(), _scan_status(), get_winning_sequence()
+    """
+    @classmethod
+    def from_moves(cls, moves: list[tuple[int, int] | list[int]], first_turn: str):
+        if not (first_turn == O_PIECE or first_turn == X_PIECE):
+            raise RuntimeError("Invalid first turn")
+        piece = [first_turn, O_PIECE if first_turn == X_PIECE else X_PIECE]
+        state = cls()
+        for i in range(len(moves)):
+            state.put(piece[i % 2], moves[i])
+        return state
+
+    def __init__(self):
+        self.last_move = None
+        self.empty_count = BOARD_SIZE * BOARD_SIZE
+        self._status = NOT_FINISH # None => unknown, recalculate by _scan_status()
+        self._win_move = None # move that changed the status from NOT_FINISH to a win, removing it restores NOT_FINISH
+        self.hash = 0 # zobrist hash, updated by put()
+
+        # listener(state, position, old_piece) is called after each change made by put().
+        # Listeners are not copied by clone().
+        self.listeners = []
+
+    def get(self, position:tuple[int, int]|list[int])->str:
+        """
+
+        :param position: tuple[row, column]
+        """
+        raise NotImplementedError
+
+    def to_cells(self)->list[list[str]]:
+        """
+        :return: a copy of the board as cells[row][column]
+        """
+        raise NotImplementedError
+
+    def get_empty_positions(self)->list[tuple[int, int]]:
+        """
+
+        :return: list( tuple[row, column] )
+        """
+        raise NotImplementedError
+
+    def _write(self, piece:str, position:tuple[int, int]|list[int])->str:
+        """
+        Store piece at position (nothing else is updated)
+        :return: the piece that was there, nothing is stored if it equals piece
+        """
+        raise NotImplementedError
+
+    def _clear_cells(self):
+        raise NotImplementedError
+
+    def _copy_cells(self, new_state):
+        """
+        Copy the cells to new_state, a new state of the same class
+        """
+        raise NotImplementedError
+
+    def check_win_at_position(self, position:tuple[int, int])->bool:
+        """
+
+        :param position: tuple[row, column]
+        :return: true if (X or O win the game)
+        """
+        raise NotImplementedError
+
+    def _scan_status(self)->int:
+        """
+        full board check, used when the cached status is unknown
+        """
+        raise NotImplementedError
+
+    def get_winning_sequence(self) -> list[tuple[int, int]]:
+        raise NotImplementedError
+
+    def put(self, piece:str, position:tuple[int, int]|list[int]):
+        """
+
+        :param piece: X_PIECE or O_PIECE
+        :param position: tuple[row, column]
+        """
+        if not (piece == X_PIECE or piece == O_PIECE or piece == EMPTY_CELL):
+            raise RuntimeError("Invalid piece value")
+        old_piece = self._write(piece, position)
+        if old_piece == piece:
+            return
+        if old_piece == EMPTY_CELL:
+            self.empty_count -= 1
+        elif piece == EMPTY_CELL:
+            self.empty_count += 1
+
+        # remove piece
+        if piece == EMPTY_CELL:
+            self.last_move = None
+            # removing a piece can not create a new winning sequence
+            if self._status == DRAW:
+                self._status = NOT_FINISH
+            elif self._status != NOT_FINISH:
+                # undo of the winning move (e.g. in search) => back to the status before it, no board scan
+                if self._win_move == (position[0], position[1]):
+                    self._status = NOT_FINISH
+                else:
+                    self._status = None
+            self._win_move = None
+
+        # place piece: only the four lines through this position can change the result
+        else:
+            self.last_move = (position[0], position[1])
+            if self._status == NOT_FINISH:
+                if self.check_win_at_position(position):
+                    self._status = X_WIN if piece == X_PIECE else O_WIN
+                    self._win_move = (position[0], position[1])
+                elif self.empty_count == 0:
+                    self._status = DRAW
+            else:
+                self._status = None
+                self._win_move = None
+
+        if old_piece != EMPTY_CELL:
+            self.hash ^= ZOBRIST_KEYS[old_piece][position[0]][position[1]]
+        if piece != EMPTY_CELL:
+            self.hash ^= ZOBRIST_KEYS[piece][position[0]][position[1]]
+
+        for listener in self.listeners:
+            listener(self, position, old_piece)
+
+    def __str__(self)->str:
+        lines = ['|' + '|'.join(row) + '|' for row in self.to_cells()]
+        return '\n'.join(lines)
+
+    def clone(self):
+        new_state = self.__class__()
+        self._copy_cells(new_state)
+        new_state.last_move = self.last_move
+        new_state.empty_count = self.empty_count
+        new_state._status = self._status
+        new_state._win_move = self._win_move
+        new_state.hash = self.hash
+        return new_state
+
+    def clear(self):
+        """
+        set all cells = EMPTY_CELL
+        Listeners are removed: caches attached to the state (e.g. CandidateMoves.of) are rebuilt on the next use
+        """
+        self._clear_cells()
+        self.last_move = None
+        self.empty_count = BOARD_SIZE * BOARD_SIZE
+        self._status = NOT_FINISH
+        self._win_move = None
+        self.hash = 0
+        self.listeners = []
+
+    def reset_status(self):
+        """
+        Forget the cached status: the next status() call checks the whole board (e.g. to time the full check)
+        """
+        self._status = None
+        self._win_move = None
+
+    def status(self)->int:
+        """
+
+        :return: constants X_WIN, O_WIN, DRAW, NOT_FINISH
+        """
+        if self._status is None:
+            self._status = self._scan_status()
+        return self._status
+
+    def get_winning_sequence_at(self, position:tuple[int, int]|list[int]) -> list[tuple[int, int]]:
+        """
+        Winning sequence through position, only the four lines through position are checked.
+        If every winning sequence of the board passes through position (e.g. position is the move
+        that ended the game), the result is the same as get_winning_sequence().
+        :return: list[tuple[row, column]] or [] if there is no winning sequence through position
+        """
+        piece = self.get((position[0], position[1]))
+        if piece == EMPTY_CELL:
+            return []
+        best = None
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        for i in range(len(directions)):
+            d = directions[i]
+            # first cell of the chain through position (directions go forward in row by row order)
+            r, c = position[0], position[1]
+            while 0 <= r - d[0] < BOARD_SIZE and 0 <= c - d[1] < BOARD_SIZE and self.get((r - d[0], c - d[1])) == piece:
+                r -= d[0]
+                c -= d[1]
+            # chain length
+            length = 0
+            while 0 <= r + length * d[0] < BOARD_SIZE and 0 <= c + length * d[1] < BOARD_SIZE \
+                    and self.get((r + length * d[0], c + length * d[1])) == piece:
+                length += 1
+            if length >= WIN_LENGTH and (best is None or (r, c, i) < best):
+                best = (r, c, i)
+        if best is None:
+            return []
+        r, c, i = best
+        return [(r + k * directions[i][0], c + k * directions[i][1]) for k in range(WIN_LENGTH)]
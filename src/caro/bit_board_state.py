@@ -0,0 +1,147 @@
+from .constants import *
+from .base_board_state import BaseBoardState
+
+# bit index of cell (row, column) = row * BOARD_SIZE + column
+CELL_BITS = [[1 << (row * BOARD_SIZE + column) for column in range(BOARD_SIZE)] for row in range(BOARD_SIZE)]
+
+def _generate_win_masks()->tuple[list[int], list[list[tuple[int, int]]], list[list[int]]]:
+    """
+    Generate all WIN_LENGTH-in-a-row masks.
+    Masks are ordered like the scan in BoardState.get_winning_sequence: start cell row by row,
+    then direction (0, 1), (1, 0), (1, 1), (1, -1).
+    :return: (masks, positions of each mask, masks passing through each cell index)
+    """
+    masks = []
+    sequences = []
+    cell_masks = [[] for _ in range(BOARD_SIZE * BOARD_SIZE)]
+    directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+    for row in range(BOARD_SIZE):
+        for column in range(BOARD_SIZE):
+            for d in directions:
+                end_row = row + d[0] * (WIN_LENGTH - 1)
+                end_column = column + d[1] * (WIN_LENGTH - 1)
+                if not (0 <= end_row < BOARD_SIZE and 0 <= end_column < BOARD_SIZE):
+                    continue
+                seq = [(row + d[0] * i, column + d[1] * i) for i in range(WIN_LENGTH)]
+                mask = 0
+                for r, c in seq:
+                    mask |= CELL_BITS[r][c]
+                masks.append(mask)
+                sequences.append(seq)
+                for r, c in seq:
+                    cell_masks[r * BOARD_SIZE + c].append(mask)
+    return masks, sequences, cell_masks
+
+WIN_MASKS, WIN_SEQUENCES, CELL_WIN_MASKS = _generate_win_masks()
+
+class BitBoardState(BaseBoardState):
+    """
+    Alternative to BoardState that stores each player's pieces as the bits of a python int.
+
+    It has the same interface as BoardState (get/put/clone/status/get_winning_sequence, ...):
+    clone() copies two ints, and win checks are mask ANDs against the precomputed WIN_MASKS.
+    """
+    def __init__(self):
+        self.x_bits = 0
+        self.o_bits = 0
+        super().__init__()
+
+    def to_cells(self)->list[list[str]]:
+        """
+        Build cells[row][column] like BoardState.cells: a copy made by 225 get() calls,
+        so code that runs at every search node should read x_bits / o_bits instead.
+        """
+        return [[self.get((row, column)) for column in range(BOARD_SIZE)] for row in range(BOARD_SIZE)]
+
+    def get(self, position:tuple[int, int]|list[int])->str:
+        """
+
+        :param position: tuple[row, column]
+        """
+        bit = CELL_BITS[position[0]][position[1]]
+        if self.x_bits & bit:
+            return X_PIECE
+        if self.o_bits & bit:
+            return O_PIECE
+        return EMPTY_CELL
+
+    def _write(self, piece:str, position:tuple[int, int]|list[int])->str:
+        bit = CELL_BITS[position[0]][position[1]]
+        if self.x_bits & bit:
+            old_piece = X_PIECE
+        elif self.o_bits & bit:
+            old_piece = O_PIECE
+        else:
+            old_piece = EMPTY_CELL
+        if old_piece == piece:
+            return old_piece
+        if old_piece == X_PIECE:
+            self.x_bits &= ~bit
+        elif old_piece == O_PIECE:
+            self.o_bits &= ~bit
+        if piece == X_PIECE:
+            self.x_bits |= bit
+        elif piece == O_PIECE:
+            self.o_bits |= bit
+        return old_piece
+
+    def _clear_cells(self):
+        self.x_bits = 0
+        self.o_bits = 0
+
+    def _copy_cells(self, new_state:'BitBoardState'):
+        new_state.x_bits = self.x_bits
+        new_state.o_bits = self.o_bits
+
+    def get_empty_positions(self)->list[tuple[int, int]]:
+        """
+
+        :return: list( tuple[row, column] )
+        """
+        occupied = self.x_bits | self.o_bits
+        l = []
+        for row in range(BOARD_SIZE):
+            for column in range(BOARD_SIZE):
+                if not (occupied & CELL_BITS[row][column]):
+                    l.append((row, column))
+        return l
+
+    def check_win_at_position(self, position:tuple[int, int])->bool:
+        """
+
+        :param position: tuple[row, column]
+        :return: true if (X or O win the game)
+        """
+        bit = CELL_BITS[position[0]][position[1]]
+        if self.x_bits & bit:
+            bits = self.x_bits
+        elif self.o_bits & bit:
+            bits = self.o_bits
+        else:
+            return False
+        for mask in CELL_WIN_MASKS[position[0] * BOARD_SIZE + position[1]]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def _scan_status(self)->int:
+        """
+        check all masks, used when the cached status is unknown
+        """
+        for mask in WIN_MASKS:
+            if self.x_bits & mask == mask:
+                return X_WIN
+            if self.o_bits & mask == mask:
+                return O_WIN
+        if self.empty_count == 0:
+            return DRAW
+        return NOT_FINISH
+
+    def get_winning_sequence(self) -> list[tuple[int, int]]:
+        if self.status() == NOT_FINISH or self.status() == DRAW:
+            return []
+        for i in range(len(WIN_MASKS)):
+            mask = WIN_MASKS[i]
+            if self.x_bits & mask == mask or self.o_bits & mask == mask:
+                return list(WIN_SEQUENCES[i])
+        return []
@@ -1,21 +1,16 @@
 from .constants import *
+from .base_board_state import BaseBoardState
 
-class BoardState:
-    @staticmethod
-    def from_moves(moves: list[tuple[int, int] | list[int]], first_turn: str):
-        if not (first_turn == O_PIECE or first_turn == X_PIECE):
-            raise RuntimeError("Invalid first turn")
-        piece = [first_turn, O_PIECE if first_turn == X_PIECE else X_PIECE]
-        state = BoardState()
-        for i in range(len(moves)):
-            state.put(piece[i % 2], moves[i])
-        return state
-
+class BoardState(BaseBoardState):
     def __init__(self):
         """
         cells[row][column]
+
+        last_move, empty_count and the cached status are kept up to date by put() (see BaseBoardState),
+        so status() only has to check the four lines through the last move.
         """
         self.cells = [[EMPTY_CELL for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        super().__init__()
 
     def get(self, position:tuple[int, int]|list[int])->str:
         """
@@ -24,24 +19,22 @@ class BoardState:
         """
         return self.cells[position[0]][position[1]]
 
-    def put(self, piece:str, position:tuple[int, int]|list[int]):
-        """
+    def to_cells(self)->list[list[str]]:
+        return [[x for x in row] for row in self.cells]
 
-        :param piece: X_PIECE or O_PIECE
-        :param position: tuple[row, column]
-        """
-        if not (piece == X_PIECE or piece == O_PIECE or piece == EMPTY_CELL):
-            raise RuntimeError("Invalid piece value")
-        self.cells[position[0]][position[1]] = piece
+    def _write(self, piece:str, position:tuple[int, int]|list[int])->str:
+        old_piece = self.cells[position[0]][position[1]]
+        if old_piece != piece:
+            self.cells[position[0]][position[1]] = piece
+        return old_piece
 
-    def __str__(self)->str:
-        lines = ['|' + '|'.join(row) + '|' for row in self.cells ]
-        return '\n'.join(lines)
+    def _clear_cells(self):
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                self.cells[r][c] = EMPTY_CELL
 
-    def clone(self)->'BoardState':
-        new_state = BoardState()
+    def _copy_cells(self, new_state:'BoardState'):
         new_state.cells = [[x for x in row] for row in self.cells]
-        return new_state
 
     def get_empty_positions(self)->list[tuple[int, int]]:
         """
@@ -55,14 +48,6 @@ class BoardState:
                     l.append((row, column))
         return l
 
-    def clear(self):
-        """
-        set all cells = EMPTY_CELL
-        """
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                self.cells[r][c] = EMPTY_CELL
-
     def check_win_at_position(self, position:tuple[int, int])->bool:
         """
 
@@ -103,22 +88,22 @@ class BoardState:
                 return True
         return False
 
-    def status(self)->int:
+    def _scan_status(self)->int:
         """
-
-        :return: constants X_WIN, O_WIN, DRAW, NOT_FINISH
+        full board scan, used when the cached status is unknown
         """
-
         for row in range(BOARD_SIZE):
             for column in range(BOARD_SIZE):
                 if self.check_win_at_position((row, column)):
                     return X_WIN if self.cells[row][column] == X_PIECE else O_WIN
 
-        if len(self.get_empty_positions()) == 0:
+        if self.empty_count == 0:
             return DRAW
         return NOT_FINISH
 
     def get_winning_sequence(self) -> list[tuple[int, int]]:
+        if self.status() == NOT_FINISH or self.status() == DRAW:
+            return []
         directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
@@ -138,4 +123,4 @@ class BoardState:
                         seq.append((r, c))
                     if len(seq) == WIN_LENGTH:
                         return seq
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,87 @@
+from .constants import *
+
+# _NEIGHBOURS[radius][row][column]: cells within `radius` of (row, column), including itself
+_NEIGHBOURS = {}
+
+def _get_neighbours(radius:int)->list[list[list[tuple[int, int]]]]:
+    if radius not in _NEIGHBOURS:
+        _NEIGHBOURS[radius] = [
+            [
+                [
+                    (row + dr, column + dc)
+                    for dr in range(-radius, radius + 1) for dc in range(-radius, radius + 1)
+                    if 0 <= row + dr < BOARD_SIZE and 0 <= column + dc < BOARD_SIZE
+                ]
+                for column in range(BOARD_SIZE)
+            ]
+            for row in range(BOARD_SIZE)
+        ]
+    return _NEIGHBOURS[radius]
+
+class CandidateMoves:
+    """
+    Set of empty cells within `radius` of at least one piece, kept up to date as a listener of a
+    board state (see BoardState.listeners).
+
+    counts[row][column] = number of pieces within `radius` of the cell: placing a piece adds 1 to its
+    neighbourhood, removing it subtracts 1, so a change costs (2*radius + 1)^2 updates instead of a
+    board scan.
+
+    Use CandidateMoves.of(state, radius) to get (or attach) the candidates of a state.
+    """
+    @staticmethod
+    def of(state, radius:int)->'CandidateMoves':
+        for listener in state.listeners:
+            if isinstance(listener, CandidateMoves) and listener.radius == radius:
+                return listener
+        candidates = CandidateMoves(state, radius)
+        state.listeners.append(candidates)
+        return candidates
+
+    def __init__(self, state, radius:int):
+        """
+        :param state: BoardState or BitBoardState
+        :param radius: search radius >= 1
+        """
+        if radius < 1:
+            raise RuntimeError("Radius must >= 1")
+        self.radius = radius
+        self.neighbours = _get_neighbours(radius)
+        self.counts = [[0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.moves = set()
+        for row in range(BOARD_SIZE):
+            for column in range(BOARD_SIZE):
+                if state.get((row, column)) != EMPTY_CELL:
+                    for r, c in self.neighbours[row][column]:
+                        self.counts[r][c] += 1
+        for row in range(BOARD_SIZE):
+            for column in range(BOARD_SIZE):
+                if self.counts[row][column] > 0 and state.get((row, column)) == EMPTY_CELL:
+                    self.moves.add((row, column))
+
+    def __call__(self, state, position:tuple[int, int], old_piece:str):
+        row, column = position[0], position[1]
+        piece = state.get(position)
+
+        # place piece
+        if old_piece == EMPTY_CELL:
+            for r, c in self.neighbours[row][column]:
+                self.counts[r][c] += 1
+                if self.counts[r][c] == 1:
+                    self.moves.add((r, c))
+            self.moves.discard((row, column))
+
+        # remove piece
+        elif piece == EMPTY_CELL:
+            for r, c in self.neighbours[row][column]:
+                self.counts[r][c] -= 1
+                if self.counts[r][c] == 0:
+                    self.moves.discard((r, c))
+            if self.counts[row][column] > 0:
+                self.moves.add((row, column))
+
+    def is_in_range(self, position:tuple[int, int])->bool:
+        """
+        :return: True if there is a piece within radius of position
+        """
+        return self.counts[position[0]][position[1]] > 0
@@ -1,7 +1,9 @@
 from .constants import *
 from .board_state import BoardState
-from typing import  Any
+from . import record_codec
+from typing import  Any, Iterator, Iterable
 import json
+import os
 import time
 
 class GameRecord:
@@ -19,40 +21,141 @@ class GameRecord:
         self.first_turn = first_turn
         self.moves = []
         self.move_timestamps = []
+        # occupied[row * BOARD_SIZE + column] = 1 if a move was played there, kept up to date like moves
+        self._occupied = bytearray(BOARD_SIZE * BOARD_SIZE)
+
+        # result cache, kept up to date by add_move() and remove_last_move()
+        self._board = None # board after all moves, None => not built yet (see _get_board)
+        self._result = NOT_FINISH # None => unknown
+        self._winning_sequence = [] # None => unknown
 
     @staticmethod
     def from_dict(data: dict[str, Any])->'GameRecord':
+        """
+        :param data: GameRecord.to_dict(). If it contains the result (and winning sequence),
+            the game does not have to be replayed to know them.
+        """
         r = GameRecord(
             player_x_name=data['player x'],
             player_o_name=data['player o'],
             first_turn=data['first turn']
         )
-        r.moves = [tuple(move) for move in data['moves']]
-        r.move_timestamps = data['move timestamps']
+        r._set_moves([(move[0], move[1]) for move in data['moves']], data['move timestamps'], validate=False)
+        r._result = data.get('result')
+        winning_sequence = data.get('winning sequence')
+        r._winning_sequence = [tuple(p) for p in winning_sequence] if winning_sequence is not None else None
         return r
 
+    @staticmethod
+    def from_moves(
+            moves: list[tuple[int, int] | list[int]],
+            first_turn: str,
+            player_x_name: str,
+            player_o_name: str,
+            move_timestamps: list[float] | None = None
+    )->'GameRecord':
+        """
+        Build a record from all its moves at once (faster than add_move() for each move,
+        the result is only computed when needed).
+        :param move_timestamps: If None => all timestamps = now
+        """
+        r = GameRecord(first_turn=first_turn, player_x_name=player_x_name, player_o_name=player_o_name)
+        if move_timestamps is None:
+            move_timestamps = [time.time()] * len(moves)
+        elif len(move_timestamps) != len(moves):
+            raise RuntimeError("Number of timestamps must equal number of moves")
+        r._set_moves([(move[0], move[1]) for move in moves], list(move_timestamps), validate=True)
+        r._result = None
+        r._winning_sequence = None
+        return r
+
+    def _set_moves(self, moves: list[tuple[int, int]], move_timestamps: list[float], validate: bool):
+        """
+        Replace all moves and rebuild the occupancy index.
+        :param validate: raise RuntimeError if a position is outside the board or played twice
+        """
+        occupied = bytearray(BOARD_SIZE * BOARD_SIZE)
+        for row, column in moves:
+            if validate:
+                if not (0 <= row < BOARD_SIZE and 0 <= column < BOARD_SIZE):
+                    raise RuntimeError("Invalid position")
+                if occupied[row * BOARD_SIZE + column]:
+                    raise RuntimeError("This position is not empty!")
+            occupied[row * BOARD_SIZE + column] = 1
+        self.moves = moves
+        self.move_timestamps = move_timestamps
+        self._occupied = occupied
+
+    @staticmethod
+    def file_format(path)->str:
+        """
+        Format of a game record file, by extension:
+            - '.crec': compact binary format, see caro.record_codec
+            - '.jsonl': JSON Lines, one record per line
+            - other: one JSON array
+        :return: 'binary', 'jsonl' or 'json'
+        """
+        path = str(path)
+        if path.endswith('.crec'):
+            return 'binary'
+        if path.endswith('.jsonl'):
+            return 'jsonl'
+        return 'json'
+
     @staticmethod
     def load_from_file(path) -> list['GameRecord']:
-        with open(path, 'r') as file:
-            data = json.load(file)
-            records = [GameRecord.from_dict(x) for x in data]
-            return records
+        return list(GameRecord.iter_file(path))
+
+    @staticmethod
+    def iter_file(path) -> Iterator['GameRecord']:
+        """
+        Read game records one by one. Binary and JSON Lines files are read lazily,
+        so their size does not matter; a JSON array file has to be loaded at once.
+        An incomplete last record (crash while it was written) is ignored.
+        """
+        file_format = GameRecord.file_format(path)
+        if file_format == 'binary':
+            with record_codec.RecordArchive(path) as archive:
+                for data in archive:
+                    yield GameRecord.from_dict(data)
+        elif file_format == 'jsonl':
+            with open(path, 'r') as file:
+                for line in file:
+                    if line.strip() == '':
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        # only the last line can be cut by a crash, it has no line end
+                        if line.endswith('\n'):
+                            raise
+                        return
+                    yield GameRecord.from_dict(data)
+        else:
+            with open(path, 'r') as file:
+                data = json.load(file)
+            for x in data:
+                yield GameRecord.from_dict(x)
 
     @staticmethod
     def save_to_file(path, records: list['GameRecord']|Any):
         """
         If `records` is a single GameRecord instance, it will be automatically
         converted into a list containing that instance.
-        :param path:
+        :param path: file format depends on the extension, see file_format()
         :param records: list[GameRecord] or GameRecord
         """
         if isinstance(records, GameRecord):
             records = [records]
+        if GameRecord.file_format(path) != 'json':
+            with GameRecordWriter(path, append=False) as writer:
+                for r in records:
+                    writer.write(r)
+            return
         with open(path, 'w') as file:
             data = [x.to_dict() for x in records]
             json.dump(data, file, indent=4)
 
-
     def add_move(
             self,
             position: tuple[int, int] | list[int],
@@ -63,22 +166,77 @@ class GameRecord:
         :param position: tuple[row, column]
         :param timestamp: If timestamp is None => timestamp = now
         """
-        if position in self.moves:
+        position = (position[0], position[1])
+        if not (0 <= position[0] < BOARD_SIZE and 0 <= position[1] < BOARD_SIZE):
+            raise RuntimeError("Invalid position")
+        index = position[0] * BOARD_SIZE + position[1]
+        if self._occupied[index]:
             raise RuntimeError("This position is not empty!")
+        board = self._get_board()
+        was_finished = self.result() != NOT_FINISH
+        piece = self.first_turn if len(self.moves) % 2 == 0 else (O_PIECE if self.first_turn == X_PIECE else X_PIECE)
+
         self.moves.append(position)
         self.move_timestamps.append(timestamp if timestamp is not None else time.time())
+        self._occupied[index] = 1
+
+        # update result: if the game was not finished, a winning sequence must pass through this move
+        board.put(piece, position)
+        self._result = board.status()
+        if was_finished:
+            self._winning_sequence = None
+        elif self._result == X_WIN or self._result == O_WIN:
+            self._winning_sequence = board.get_winning_sequence_at(position)
+        else:
+            self._winning_sequence = []
 
     def remove_last_move(self):
         if len(self.moves) == 0:
             return
+        if self._board is not None:
+            self._board.put(EMPTY_CELL, self.moves[-1])
+        self._occupied[self.moves[-1][0] * BOARD_SIZE + self.moves[-1][1]] = 0
         self.moves.pop()
         self.move_timestamps.pop()
+        self._result = self._board.status() if self._board is not None else None
+        self._winning_sequence = None
+
+    def _get_board(self)->BoardState:
+        """
+        :return: board after all moves (replayed once, then kept up to date)
+        """
+        if self._board is None:
+            self._board = BoardState.from_moves(self.moves, self.first_turn)
+        return self._board
 
     def result(self):
         """
         :return: X_WIN, O_WIN, DRAW, NOT_FINISH
         """
-        return BoardState.from_moves(self.moves, self.first_turn).status()
+        if self._result is None:
+            self._result = self._get_board().status()
+        return self._result
+
+    def get_winning_sequence(self)->list[tuple[int, int]]:
+        """
+        :return: same as BoardState.get_winning_sequence() of the board after all moves
+        """
+        if self._winning_sequence is None:
+            if self.result() == X_WIN or self.result() == O_WIN:
+                self._winning_sequence = self._get_board().get_winning_sequence()
+            else:
+                self._winning_sequence = []
+        return list(self._winning_sequence)
+
+    @staticmethod
+    def from_bytes(data:bytes)->'GameRecord':
+        return GameRecord.from_dict(record_codec.decode_record(data))
+
+    def to_bytes(self)->bytes:
+        """
+        compact binary encoding, see caro.record_codec
+        """
+        return record_codec.encode_record(self.to_dict())
 
     def to_dict(self)->dict[str, Any]:
         return  {
@@ -86,7 +244,9 @@ class GameRecord:
             'player o': self.player_o,
             'first turn': self.first_turn,
             'moves': self.moves,
-            'move timestamps': self.move_timestamps
+            'move timestamps': self.move_timestamps,
+            'result': self.result(),
+            'winning sequence': self.get_winning_sequence()
         }
 
     def __str__(self):
@@ -98,8 +258,7 @@ class GameRecord:
         for i in range(len(self.moves)):
             s += f'{i}. {piece[i%2]} - {self.moves[i]} at {self.move_timestamps[i]}\n'
 
-        board_state = BoardState.from_moves(self.moves, self.first_turn)
-        status = board_state.status()
+        status = self.result()
         if status == DRAW:
             s += "Result: DRAW!\n"
         elif status == X_WIN:
@@ -111,4 +270,93 @@ class GameRecord:
         return s
 
     def __repr__(self):
-        return  self.__str__()
\ No newline at end of file
+        return  self.__str__()
+
+class GameRecordWriter:
+    """
+    Append game records to a JSON Lines ('.jsonl') or binary ('.crec') file, one record at a time.
+    Each record is flushed as soon as it is written, so a crash only loses the game being played:
+    readers ignore a record cut by a crash, and appending removes it first.
+
+    Example:
+        with GameRecordWriter('records.jsonl') as writer:
+            for r in records:
+                writer.write(r)
+    """
+    def __init__(self, path, append:bool=True):
+        """
+        :param path: file path ('.jsonl' or '.crec')
+        :param append: False => overwrite the file
+        """
+        self.path = path
+        self.binary = GameRecord.file_format(path) == 'binary'
+        if not self.binary and GameRecord.file_format(path) != 'jsonl':
+            raise RuntimeError("GameRecordWriter only writes '.jsonl' or '.crec' files")
+        if append:
+            if self.binary:
+                record_codec.check_appendable(path)
+            else:
+                GameRecordWriter._repair_jsonl_end(path)
+        mode = 'a' if append else 'w'
+        self.file = open(path, mode + 'b' if self.binary else mode)
+        if self.binary and self.file.tell() == 0:
+            self.file.write(record_codec.HEADER)
+        self.count = 0
+
+    @staticmethod
+    def _repair_jsonl_end(path):
+        """
+        Make the file end with a line end before appending: a last line without it is either a
+        complete record (a line end is added) or a record cut by a crash (it is removed).
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as file:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            if size == 0:
+                return
+            file.seek(size - 1)
+            if file.read(1) == b'\n':
+                return
+            # start of the last line
+            start = size
+            block = 4096
+            while start > 0:
+                n = min(block, start)
+                file.seek(start - n)
+                chunk = file.read(n)
+                i = chunk.rfind(b'\n')
+                if i != -1:
+                    start = start - n + i + 1
+                    break
+                start -= n
+            file.seek(start)
+            last_line = file.read()
+            try:
+                json.loads(last_line)
+                file.write(b'\n')
+            except ValueError:
+                file.truncate(start)
+
+    def write(self, record:GameRecord):
+        if self.binary:
+            self.file.write(record_codec.encode_file_record(record.to_dict()))
+        else:
+            self.file.write(json.dumps(record.to_dict()) + '\n')
+        self.file.flush()
+        self.count += 1
+
+    def write_all(self, records:Iterable[GameRecord]):
+        for r in records:
+            self.write(r)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,256 @@
+"""
+Compact binary encoding of game records.
+
+File:
+    MAGIC (7 bytes) + VERSION (1 byte), then records, each one prefixed by its size (varint).
+
+Record:
+    flags                   1 byte: bit 0 = first turn (0 = X, 1 = O)
+                                    bits 1-3 = result + 1 (0 = unknown, version >= 2)
+    player x, player o      varint length + utf-8 bytes
+    number of moves         varint
+    moves                   1 byte per move: row * BOARD_SIZE + column
+    timestamps              first: 8 bytes (float64, big endian)
+                            next: zigzag varint of the difference between the float64 bit patterns
+                                  of two consecutive timestamps (a few bytes, decoded exactly)
+    winning sequence        varint length + 1 byte per position (version >= 2)
+
+The decoder works on dicts with the same keys as GameRecord.to_dict/from_dict.
+"""
+import os
+import mmap
+import struct
+from typing import Any, Iterator
+from .constants import *
+
+MAGIC = b'CAROREC'
+VERSION = 2
+HEADER = MAGIC + bytes([VERSION])
+SUPPORTED_VERSIONS = (1, 2)
+
+if BOARD_SIZE * BOARD_SIZE > 256:
+    raise RuntimeError("A move must fit in one byte")
+
+def write_varint(buffer:bytearray, value:int):
+    """
+    :param value: >= 0
+    """
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varint(data:bytes|memoryview|mmap.mmap, offset:int)->tuple[int, int]:
+    """
+    :return: tuple(value, offset after the varint)
+    """
+    value = 0
+    shift = 0
+    while True:
+        b = data[offset]
+        offset += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, offset
+        shift += 7
+
+def _zigzag(value:int)->int:
+    return 2 * value if value >= 0 else -2 * value - 1
+
+def _unzigzag(value:int)->int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+def _float_bits(value:float)->int:
+    return struct.unpack('>q', struct.pack('>d', value))[0]
+
+def _bits_float(bits:int)->float:
+    return struct.unpack('>d', struct.pack('>q', bits))[0]
+
+def _write_str(buffer:bytearray, s:str):
+    data = s.encode('utf-8')
+    write_varint(buffer, len(data))
+    buffer += data
+
+def _read_str(data, offset:int)->tuple[str, int]:
+    n, offset = read_varint(data, offset)
+    return bytes(data[offset:offset + n]).decode('utf-8'), offset + n
+
+def encode_record(data:dict[str, Any])->bytes:
+    """
+    :param data: GameRecord.to_dict()
+    """
+    buffer = bytearray()
+    flags = 0 if data['first turn'] == X_PIECE else 1
+    if data.get('result') is not None:
+        flags |= (data['result'] + 1) << 1
+    buffer.append(flags)
+    _write_str(buffer, data['player x'])
+    _write_str(buffer, data['player o'])
+
+    moves = data['moves']
+    write_varint(buffer, len(moves))
+    buffer += bytes(m[0] * BOARD_SIZE + m[1] for m in moves)
+
+    timestamps = data['move timestamps']
+    if len(timestamps) != len(moves):
+        raise RuntimeError("Number of timestamps must equal number of moves")
+    if len(timestamps) > 0:
+        previous = _float_bits(float(timestamps[0]))
+        buffer += struct.pack('>q', previous)
+        for t in timestamps[1:]:
+            bits = _float_bits(float(t))
+            write_varint(buffer, _zigzag(bits - previous))
+            previous = bits
+
+    winning_sequence = data.get('winning sequence') or []
+    write_varint(buffer, len(winning_sequence))
+    buffer += bytes(p[0] * BOARD_SIZE + p[1] for p in winning_sequence)
+    return bytes(buffer)
+
+def decode_record(data:bytes|memoryview|mmap.mmap, offset:int=0, version:int=VERSION)->dict[str, Any]:
+    """
+    :param data: buffer containing an encoded record at offset
+    :param version: format version of the record (see the file header)
+    :return: dict for GameRecord.from_dict()
+    """
+    flags = data[offset]
+    first_turn = X_PIECE if (flags & 1) == 0 else O_PIECE
+    offset += 1
+    player_x, offset = _read_str(data, offset)
+    player_o, offset = _read_str(data, offset)
+
+    n_moves, offset = read_varint(data, offset)
+    moves = [(b // BOARD_SIZE, b % BOARD_SIZE) for b in data[offset:offset + n_moves]]
+    offset += n_moves
+
+    timestamps = []
+    if n_moves > 0:
+        previous = struct.unpack('>q', data[offset:offset + 8])[0]
+        offset += 8
+        timestamps.append(_bits_float(previous))
+        for _ in range(n_moves - 1):
+            delta, offset = read_varint(data, offset)
+            previous += _unzigzag(delta)
+            timestamps.append(_bits_float(previous))
+
+    record = {
+        'player x': player_x,
+        'player o': player_o,
+        'first turn': first_turn,
+        'moves': moves,
+        'move timestamps': timestamps
+    }
+    if version >= 2 and (flags >> 1) != 0:
+        record['result'] = (flags >> 1) - 1
+        n, offset = read_varint(data, offset)
+        record['winning sequence'] = [(b // BOARD_SIZE, b % BOARD_SIZE) for b in data[offset:offset + n]]
+    return record
+
+def encode_file_record(data:dict[str, Any])->bytes:
+    """
+    :return: record prefixed by its size, ready to append to a file
+    """
+    payload = encode_record(data)
+    buffer = bytearray()
+    write_varint(buffer, len(payload))
+    buffer += payload
+    return bytes(buffer)
+
+def check_appendable(path):
+    """
+    Raise RuntimeError if records of the current version can not be appended to the file.
+    An incomplete last record (crash while it was written) is cut off, so new records start after the last complete one.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as file:
+        header = file.read(len(HEADER))
+    if header != HEADER:
+        raise RuntimeError("Can not append to a game record file of another format version")
+    with RecordArchive(path) as archive:
+        end = archive.complete_size()
+    if end < os.path.getsize(path):
+        os.truncate(path, end)
+
+class RecordArchive:
+    """
+    Read only, memory mapped view of a binary game record file.
+    Records are decoded on access; the file is never loaded at once.
+
+    Example:
+        with RecordArchive(path) as archive:
+            print(len(archive))
+            for data in archive:
+                record = GameRecord.from_dict(data)
+    """
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file can not be memory mapped
+            self.data = b''
+        self.version = VERSION
+        if len(self.data) > 0:
+            if self.data[:len(MAGIC)] != MAGIC or self.data[len(MAGIC)] not in SUPPORTED_VERSIONS:
+                self.close()
+                raise RuntimeError("Invalid game record file")
+            self.version = self.data[len(MAGIC)]
+        self._offsets = None
+
+    def iter_spans(self)->Iterator[tuple[int, int]]:
+        """
+        :return: iterator of (offset, size) of each record (only the size prefixes are read).
+            An incomplete last record (crash while it was written) ends the file.
+        """
+        offset = len(HEADER)
+        while offset < len(self.data):
+            try:
+                size, start = read_varint(self.data, offset)
+            except IndexError:
+                return
+            if start + size > len(self.data):
+                return
+            yield start, size
+            offset = start + size
+
+    def iter_offsets(self)->Iterator[int]:
+        """
+        :return: iterator of the offset of each record
+        """
+        for offset, _ in self.iter_spans():
+            yield offset
+
+    def complete_size(self)->int:
+        """
+        :return: number of bytes used by the header and the complete records
+        """
+        end = len(HEADER) if len(self.data) > 0 else 0
+        for offset, size in self.iter_spans():
+            end = offset + size
+        return end
+
+    def __iter__(self)->Iterator[dict[str, Any]]:
+        for offset in self.iter_offsets():
+            yield decode_record(self.data, offset, self.version)
+
+    def __len__(self):
+        if self._offsets is None:
+            self._offsets = list(self.iter_offsets())
+        return len(self._offsets)
+
+    def __getitem__(self, index:int)->dict[str, Any]:
+        if self._offsets is None:
+            self._offsets = list(self.iter_offsets())
+        return decode_record(self.data, self._offsets[index], self.version)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
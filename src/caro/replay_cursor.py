@@ -0,0 +1,95 @@
+from .constants import *
+from .board_state import BoardState
+from .game_record import GameRecord
+
+class ReplayCursor:
+    """
+    Board of a game record after any number of moves (ply), for stepping through a game.
+
+    forward() and backward() put or remove a single move. seek() restores the nearest keyframe
+    (a copy of the board saved every keyframe_interval moves) and plays the few moves after it,
+    so jumping to any ply costs at most one board copy and keyframe_interval moves.
+
+    The record must not change while the cursor is used.
+
+    Example:
+        cursor = ReplayCursor(game_record)  # at the end of the game
+        cursor.backward()
+        cursor.seek(10)                     # board after the first 10 moves
+        draw(cursor.state, cursor.last_move())
+    """
+    def __init__(self, record:GameRecord, keyframe_interval:int=16, ply:int|None=None):
+        """
+        :param keyframe_interval: moves between two keyframes
+        :param ply: number of moves played on the board, None => all moves
+        """
+        if keyframe_interval < 1:
+            raise RuntimeError("Invalid keyframe interval")
+        self.record = record
+        self.keyframe_interval = keyframe_interval
+        self.pieces = [record.first_turn, O_PIECE if record.first_turn == X_PIECE else X_PIECE]
+
+        # replay the game once: keyframes[i] = board after i * keyframe_interval moves
+        self.keyframes = []
+        state = BoardState()
+        for i in range(len(record.moves) + 1):
+            if i % keyframe_interval == 0:
+                self.keyframes.append(state.clone())
+            if i < len(record.moves):
+                state.put(self.pieces[i % 2], record.moves[i])
+
+        self.state = state
+        self.ply = len(record.moves)
+        if ply is not None:
+            self.seek(ply)
+
+    def __len__(self)->int:
+        """
+        :return: number of moves of the record
+        """
+        return len(self.record.moves)
+
+    def last_move(self)->tuple[int, int] | None:
+        """
+        :return: last move played on the board, None => ply = 0
+        """
+        return self.record.moves[self.ply - 1] if self.ply > 0 else None
+
+    def forward(self)->bool:
+        """
+        Play the next move.
+        :return: False if the cursor is already at the end
+        """
+        if self.ply >= len(self.record.moves):
+            return False
+        self.state.put(self.pieces[self.ply % 2], self.record.moves[self.ply])
+        self.ply += 1
+        return True
+
+    def backward(self)->bool:
+        """
+        Remove the last move.
+        :return: False if the cursor is already at the start
+        """
+        if self.ply <= 0:
+            return False
+        self.ply -= 1
+        self.state.put(EMPTY_CELL, self.record.moves[self.ply])
+        self.state.last_move = self.last_move()
+        return True
+
+    def seek(self, ply:int):
+        """
+        Move the cursor to the board after ply moves.
+        """
+        if not (0 <= ply <= len(self.record.moves)):
+            raise RuntimeError("Invalid ply")
+        key_ply = (ply // self.keyframe_interval) * self.keyframe_interval
+        # restore the keyframe if it is closer than the current board
+        if abs(ply - self.ply) > ply - key_ply:
+            self.state = self.keyframes[ply // self.keyframe_interval].clone()
+            self.ply = key_ply
+        while self.ply < ply:
+            self.forward()
+        while self.ply > ply:
+            self.backward()
@@ -0,0 +1,17 @@
+import random
+from .constants import *
+
+# Fixed seed: hash values are the same in every process (needed to share results between processes)
+_rng = random.Random(142857)
+
+# ZOBRIST_KEYS[piece][row][column]
+ZOBRIST_KEYS = {
+    piece: [[_rng.getrandbits(64) for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    for piece in (X_PIECE, O_PIECE)
+}
+
+# xor with the board hash to take the side to move into account
+ZOBRIST_TURN_KEYS = {
+    X_PIECE: _rng.getrandbits(64),
+    O_PIECE: _rng.getrandbits(64)
+}
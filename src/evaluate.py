@@ -1,3 +1,6 @@
+import os
+import tempfile
+from array import array
 import caro
 
 def evaluate(state:caro.BoardState, current_turn:str):
@@ -18,6 +21,23 @@ def evaluate_for_x_o(state:caro.BoardState, current_turn:str):
     elif status == caro.DRAW:
         return 0, 0
 
+    return LineScores.of(state).evaluate_for_x_o(current_turn)
+
+def evaluate_for_x_o_full_scan(state:caro.BoardState, current_turn:str):
+    """
+    Reference implementation of evaluate_for_x_o: scan the whole board in all 4 directions.
+    """
+    if not (current_turn == caro.X_PIECE or current_turn == caro.O_PIECE):
+        raise RuntimeError("Invalid current turn")
+
+    status = state.status()
+    if status == caro.X_WIN:
+        return float('inf'), 0
+    elif status == caro.O_WIN:
+        return 0, float('inf')
+    elif status == caro.DRAW:
+        return 0, 0
+
     eval_x = 0
     eval_o = 0
     directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
@@ -124,6 +144,232 @@ def find_chain(state:caro.BoardState, position:tuple[int, int], direction:tuple[
 
     return result
 
+def _generate_lines()->tuple[list[list[tuple[int, int]]], list[list[list[int]]]]:
+    """
+    All rows, columns and diagonals that are long enough to contain WIN_LENGTH cells
+    (72 lines on a 15x15 board). Shorter diagonals always score 0.
+    :return: (lines, (line id, index in line) of the lines passing through each cell[row][column])
+    """
+    lines = []
+    for d in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        for row in range(caro.BOARD_SIZE):
+            for column in range(caro.BOARD_SIZE):
+                # only start a line at its first cell
+                prev_r, prev_c = row - d[0], column - d[1]
+                if 0 <= prev_r < caro.BOARD_SIZE and 0 <= prev_c < caro.BOARD_SIZE:
+                    continue
+                line = []
+                r, c = row, column
+                while 0 <= r < caro.BOARD_SIZE and 0 <= c < caro.BOARD_SIZE:
+                    line.append((r, c))
+                    r += d[0]
+                    c += d[1]
+                if len(line) >= caro.WIN_LENGTH:
+                    lines.append(line)
+
+    cell_lines = [[[] for _ in range(caro.BOARD_SIZE)] for _ in range(caro.BOARD_SIZE)]
+    for i in range(len(lines)):
+        for j in range(len(lines[i])):
+            r, c = lines[i][j]
+            cell_lines[r][c].append((i, j))
+    return lines, cell_lines
+
+LINES, CELL_LINES = _generate_lines()
+
+def calc_eval_line(pieces:list[str])->tuple[int, int, int, int]:
+    """
+    Same rules as calc_eval_by_direction, applied to a single line.
+    :param pieces: pieces of the line, in order
+    :return: (x if x is current turn, x if o is current turn, o if o is current turn, o if x is current turn)
+    """
+    x_cur, x_not, o_cur, o_not = 0, 0, 0, 0
+    n = len(pieces)
+    i = 0
+    while i < n:
+        piece = pieces[i]
+        if piece == caro.EMPTY_CELL:
+            i += 1
+            continue
+        end = i
+        while end + 1 < n and pieces[end + 1] == piece:
+            end += 1
+
+        before = 0
+        j = i - 1
+        while j >= 0 and before < caro.WIN_LENGTH and (pieces[j] == piece or pieces[j] == caro.EMPTY_CELL):
+            before += 1
+            j -= 1
+        after = 0
+        j = end + 1
+        while j < n and after < caro.WIN_LENGTH and (pieces[j] == piece or pieces[j] == caro.EMPTY_CELL):
+            after += 1
+            j += 1
+
+        chain = end - i + 1
+        if piece == caro.X_PIECE:
+            x_cur += calculation_chain(before, chain, after, True)
+            x_not += calculation_chain(before, chain, after, False)
+        else:
+            o_cur += calculation_chain(before, chain, after, True)
+            o_not += calculation_chain(before, chain, after, False)
+        i = end + 1
+    return x_cur, x_not, o_cur, o_not
+
+# Pattern table
+# A line is split by the opponent's pieces into segments that contain only the player's pieces
+# and empty cells. The score of the player's chains inside a segment depends only on the segment
+# length and which of its cells are occupied, so it can be precomputed for every segment:
+#   key = (1 << length) | occupied bits  (bit i = cell i of the segment)
+PATTERN_TABLE_VERSION = 1
+PATTERN_TABLE_SIZE = 1 << (caro.BOARD_SIZE + 1)
+PATTERN_TABLE_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', 'cache',
+    f'pattern_table_v{PATTERN_TABLE_VERSION}_{caro.BOARD_SIZE}_{caro.WIN_LENGTH}.bin'
+))
+
+def generate_pattern_table()->tuple[array, array]:
+    """
+    :return: (score if current turn, score if not current turn) for each segment key
+    """
+    table_cur = array('q', bytes(8 * PATTERN_TABLE_SIZE))
+    table_not = array('q', bytes(8 * PATTERN_TABLE_SIZE))
+    for length in range(1, caro.BOARD_SIZE + 1):
+        for bits in range(1 << length):
+            pieces = [caro.X_PIECE if (bits >> i) & 1 else caro.EMPTY_CELL for i in range(length)]
+            x_cur, x_not, _, _ = calc_eval_line(pieces)
+            table_cur[(1 << length) | bits] = x_cur
+            table_not[(1 << length) | bits] = x_not
+    return table_cur, table_not
+
+def load_pattern_table(path:str=PATTERN_TABLE_PATH)->tuple[array, array]:
+    """
+    Load the pattern table from the cache file, generate and save it if the file does not exist.
+    """
+    table_cur = array('q')
+    table_not = array('q')
+    try:
+        with open(path, 'rb') as file:
+            table_cur.fromfile(file, PATTERN_TABLE_SIZE)
+            table_not.fromfile(file, PATTERN_TABLE_SIZE)
+        return table_cur, table_not
+    except (OSError, EOFError):
+        pass
+
+    table_cur, table_not = generate_pattern_table()
+    # several processes (pool workers, agent processes) may generate the table at the same time:
+    # write a temporary file and rename it, so a reader never sees a half written table
+    temp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            table_cur.tofile(file)
+            table_not.tofile(file)
+        os.replace(temp_path, path)
+    except OSError:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+    return table_cur, table_not
+
+PATTERN_TABLE_CUR, PATTERN_TABLE_NOT = load_pattern_table()
+
+def calc_eval_line_bits(player_bits:int, opponent_bits:int, length:int)->tuple[int, int]:
+    """
+    Score the chains of one player in a line using the pattern table.
+    :param player_bits: bit i = 1 if cell i of the line is the player's piece
+    :param opponent_bits: bit i = 1 if cell i of the line is the opponent's piece
+    :param length: number of cells in the line
+    :return: (score if player is current turn, score if opponent is current turn)
+    """
+    score_cur, score_not = 0, 0
+    blockers = opponent_bits | (1 << length)
+    start = 0
+    while start < length:
+        # distance to the next opponent piece (or the end of the line)
+        b = blockers >> start
+        segment = (b & -b).bit_length() - 1
+        if segment >= caro.WIN_LENGTH:
+            key = (1 << segment) | ((player_bits >> start) & ((1 << segment) - 1))
+            score_cur += PATTERN_TABLE_CUR[key]
+            score_not += PATTERN_TABLE_NOT[key]
+        start += segment + 1
+    return score_cur, score_not
+
+class LineScores:
+    """
+    Cached score of each line of a board state, kept up to date as a listener of the state:
+    a change recalculates only the lines through the changed cell, and removing the last
+    placed piece restores the saved scores.
+
+    Use LineScores.of(state) to get (or attach) the cache of a state.
+    """
+    @staticmethod
+    def of(state:caro.BoardState)->'LineScores':
+        for listener in state.listeners:
+            if isinstance(listener, LineScores):
+                return listener
+        line_scores = LineScores(state)
+        state.listeners.append(line_scores)
+        return line_scores
+
+    def __init__(self, state:caro.BoardState):
+        # pieces of each line as bits: bit i = cell i of the line
+        self.x_bits = [0 for _ in LINES]
+        self.o_bits = [0 for _ in LINES]
+        for i in range(len(LINES)):
+            for j in range(len(LINES[i])):
+                piece = state.get(LINES[i][j])
+                if piece == caro.X_PIECE:
+                    self.x_bits[i] |= 1 << j
+                elif piece == caro.O_PIECE:
+                    self.o_bits[i] |= 1 << j
+        self.scores = [self._calc_line(i) for i in range(len(LINES))]
+        self.total = [sum(s[i] for s in self.scores) for i in range(4)]
+        # history of changes: (position, old piece, saved scores of the lines through position)
+        self.history = []
+
+    def __call__(self, state:caro.BoardState, position:tuple[int, int], old_piece:str):
+        lines = CELL_LINES[position[0]][position[1]]
+        piece = state.get(position)
+        for line_id, index in lines:
+            bit = 1 << index
+            self.x_bits[line_id] &= ~bit
+            self.o_bits[line_id] &= ~bit
+            if piece == caro.X_PIECE:
+                self.x_bits[line_id] |= bit
+            elif piece == caro.O_PIECE:
+                self.o_bits[line_id] |= bit
+
+        # undo the last placed piece => roll back
+        if self.history and old_piece != caro.EMPTY_CELL and piece == caro.EMPTY_CELL:
+            last_position, last_old_piece, saved = self.history[-1]
+            if last_old_piece == caro.EMPTY_CELL and last_position[0] == position[0] and last_position[1] == position[1]:
+                self.history.pop()
+                for (line_id, _), score in zip(lines, saved):
+                    self._set_score(line_id, score)
+                return
+
+        self.history.append((position, old_piece, [self.scores[line_id] for line_id, _ in lines]))
+        for line_id, _ in lines:
+            self._set_score(line_id, self._calc_line(line_id))
+
+    def _calc_line(self, line_id:int)->tuple[int, int, int, int]:
+        length = len(LINES[line_id])
+        x_cur, x_not = calc_eval_line_bits(self.x_bits[line_id], self.o_bits[line_id], length)
+        o_cur, o_not = calc_eval_line_bits(self.o_bits[line_id], self.x_bits[line_id], length)
+        return x_cur, x_not, o_cur, o_not
+
+    def _set_score(self, line_id:int, score:tuple[int, int, int, int]):
+        old = self.scores[line_id]
+        self.scores[line_id] = score
+        for i in range(4):
+            self.total[i] += score[i] - old[i]
+
+    def evaluate_for_x_o(self, current_turn:str)->tuple[int, int]:
+        if current_turn == caro.X_PIECE:
+            return self.total[0], self.total[3]
+        return self.total[1], self.total[2]
+
 # test
 if __name__ == '__main__':
     from app import App
@@ -3,9 +3,11 @@ import time
 import pygame
 from app import App
 from minimax import MiniMax
+from threats import VCFSearch
 from evaluate import evaluate
 import caro
 import tournament
+from typing import Iterable
 
 # game record default directory
 DEFAULT_GAME_RECORD_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'game_records'))
@@ -15,7 +17,7 @@ if not os.path.exists(DEFAULT_GAME_RECORD_DIRECTORY):
 def get_game_record_path(filename):
     return os.path.join(DEFAULT_GAME_RECORD_DIRECTORY, filename)
 
-def analyze(game_records:list[caro.GameRecord]):
+def analyze(game_records:Iterable[caro.GameRecord]):
 
     statistics, matches = tournament.analyze_game_record(game_records)
 
@@ -117,23 +119,27 @@ if __name__ == '__main__':
             app = App(font_name='Roboto-Regular.ttf', unit_size=15)
             app.play_n_game(
                 player_x=caro.Human("You"),
-                player_o=MiniMax(name="AI", evaluate_function=evaluate, depth=2, search_radius=1, random_move=10),
+                player_o=MiniMax(name="AI", evaluate_function=evaluate, depth=2, search_radius=1, random_move=10,
+                                 threat_search=VCFSearch(), transposition_table_size=1 << 16),
                 number_of_game=2,
-                first_turn=caro.X_PIECE
+                first_turn=caro.X_PIECE,
+                ponder=True
             )
+            app.close_agent_processes()
             pygame.display.quit()
 
         # run tournament
         elif choice == 2:
             print("Number of games each agent will play with every other agent:")
             n = int(input(">> n = "))
-
-            # make tournament
-            game_records = tournament.tournament(agents, n)
-
-            # save result to file
-            path = get_game_record_path(f'tournament_{int(time.time())}.json')
-            caro.GameRecord.save_to_file(path, game_records)
+            print(f"Number of processes playing games at the same time (1 => one game at a time, this computer has {os.cpu_count()} cores):")
+            workers = int(input(">> workers = "))
+
+            # make tournament, game records are saved to file as soon as each game is finished
+            path = get_game_record_path(f'tournament_{int(time.time())}.jsonl')
+            print(f"Game records will be saved to '{path}'")
+            with caro.GameRecordWriter(path) as writer:
+                game_records = tournament.tournament(agents, n, workers=workers, writer=writer)
             print(f"Game record was saved to '{path}'")
 
             # analyze
@@ -144,7 +150,7 @@ if __name__ == '__main__':
         elif choice == 3:
             print(f"A file will be selected from the default directory: '{DEFAULT_GAME_RECORD_DIRECTORY}'")
             file_name = input(">> File name: ")
-            game_records = caro.GameRecord.load_from_file(get_game_record_path(file_name))
+            game_records = caro.GameRecord.iter_file(get_game_record_path(file_name))
 
             print('\n\n')
             analyze(game_records)
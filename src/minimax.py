@@ -1,6 +1,19 @@
 from typing import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 import caro
 import random
+import time
+import transposition_table as tt
+import threats
+from move_ordering import MoveOrdering
+from search_stats import SearchStats, TimedCall, CountedProbe
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time limit of MiniMax is reached
+    """
+    pass
 
 class MiniMax(caro.AI):
     def __init__(
@@ -9,36 +22,140 @@ class MiniMax(caro.AI):
             depth: int,
             search_radius: int,
             random_move: int,
-            evaluate_function: Callable[[caro.BoardState, str], float | int]
+            evaluate_function: Callable[[caro.BoardState, str], float | int],
+            transposition_table_size: int = 0,
+            replacement_policy: str = 'depth',
+            time_limit: float | None = None,
+            move_ordering: MoveOrdering | None = None,
+            workers: int = 1,
+            threat_search: threats.VCFSearch | None = None,
+            search_mode: str = 'alphabeta',
+            aspiration_window: int | float = 0,
+            null_window: int | float = 1,
+            collect_stats: bool = False
     ):
+        """
+        :param transposition_table_size: number of transposition table slots, 0 => no transposition table.
+            The table is kept between decide_move calls.
+        :param replacement_policy: 'depth' or 'always', see TranspositionTable
+        :param time_limit: seconds per decision, None => search to `depth`.
+            If not None, decide_move deepens iteratively (up to `depth`) and returns the best move
+            of the last completed iteration when the time is up.
+        :param move_ordering: heuristic used to sort the moves of each node, None => no ordering.
+            See move_ordering.HeuristicOrdering.
+        :param workers: number of processes used to search the root moves, 1 => search in this process.
+            With workers > 1, evaluate_function must be picklable (a module level function) and
+            close() should be called when the agent is no longer used.
+        :param threat_search: if not None, decide_move first plays an immediate win, blocks the opponent's four
+            or starts a forced win found by this search (see threats.forced_move), without a minimax search.
+        :param search_mode:
+            - 'alphabeta': every root move is searched with a full window
+            - 'pvs': principal variation search, the first move of a node is searched with the (alpha, beta)
+                window, the others with a null window and again with (alpha, beta) only if they are better.
+                The root bound is passed to the next root moves and decide_move always deepens iteratively.
+        :param aspiration_window: 'pvs' only, > 0 => each iteration of decide_move first searches the window
+            (previous eval - aspiration_window, previous eval + aspiration_window), and the full window if the
+            eval falls outside of it.
+        :param null_window: 'pvs' only, smallest difference between two evals (1 for integer evals)
+        :param collect_stats: True => `stats` is a SearchStats of the last decide_move call.
+            When False, nothing is measured.
+        """
         self.depth = depth if depth >= 1 else 1
         self.search_radius = search_radius if search_radius >= 1 else 1
         self.random_move = random_move if random_move >= 0 else 0
         self.evaluate_function = evaluate_function
+        self.transposition_table = tt.TranspositionTable(transposition_table_size, replacement_policy) \
+            if transposition_table_size > 0 else None
+        self.time_limit = time_limit if (time_limit is None or time_limit > 0) else None
+        self.deadline = None # time.perf_counter() value, set by decide_move when time_limit is used
+        self.stop_requested = False # set by stop(), possibly from another thread
+        self.move_ordering = move_ordering
+        self.root_depth = self.depth # depth of the current root search, ply = root_depth - depth_limit
+        self.node_count = 0 # number of nodes searched by the last decide_move call
+        self.workers = workers if workers >= 1 else 1
+        self.threat_search = threat_search
+        if search_mode != 'alphabeta' and search_mode != 'pvs':
+            raise RuntimeError("Invalid search mode")
+        self.search_mode = search_mode
+        self.aspiration_window = aspiration_window if aspiration_window > 0 else 0
+        self.null_window = null_window
+        self._pool = None # ProcessPoolExecutor, created on the first parallel search
+        self._root_bound = None # best root eval so far, shared with the worker processes
+        self._stop_flag = None # stop_requested shared with the worker processes
+        self._search_id = 0 # number of decide_move calls, the workers start a new search when it changes
         super().__init__(name)
 
+        # functions called by the search, kept on the agent: move_ordering and threat_search may be shared
+        # with other agents, so they are never modified
+        self._order = self.move_ordering.order if self.move_ordering is not None else None
+        self._find_threats = self.threat_search.find if self.threat_search is not None else None
+        self._tt_get = self.transposition_table.get if self.transposition_table is not None else None
+
+        # statistics: the measured functions are wrapped once, so a disabled agent runs the plain functions
+        self.stats = None
+        if collect_stats:
+            self.stats = SearchStats()
+            self.evaluate_function = TimedCall(self.stats, 'evaluate', self.evaluate_function)
+            self.find_valid_moves = TimedCall(self.stats, 'find valid moves', self.find_valid_moves)
+            if self._order is not None:
+                self._order = TimedCall(self.stats, 'ordering', self._order)
+            if self._find_threats is not None:
+                self._find_threats = TimedCall(self.stats, 'threat search', self._find_threats)
+            if self._tt_get is not None:
+                self._tt_get = CountedProbe(self.stats, self._tt_get)
+
+    def __getstate__(self):
+        # the process pool belongs to the process that created it
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['_root_bound'] = None
+        state['_stop_flag'] = None
+        return state
+
+    def stop(self):
+        """
+        Ask the running search (e.g. in another thread) to stop as soon as possible: it ends like a timeout,
+        decide_move returns the best move of the last completed iteration (iterative deepening) or
+        raises SearchTimeout. The flag stays set until the caller resets stop_requested to False.
+        """
+        self.stop_requested = True
+        if self._stop_flag is not None:
+            self._stop_flag.value = 1
+
+    def close(self):
+        """
+        Shut down the worker processes (if any)
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._root_bound = None
+            self._stop_flag = None
+
     def find_valid_moves(self, state: caro.BoardState) -> list[tuple[int, int]]:
-        if len(state.get_empty_positions()) == caro.BOARD_SIZE ** 2:
+        if state.empty_count == caro.BOARD_SIZE ** 2:
             return state.get_empty_positions()
 
-        all_moves = set()
-        in_range = set()
-        radius = [_ for _ in range(-self.search_radius, self.search_radius + 1)]
-        for row in range(caro.BOARD_SIZE):
-            for col in range(caro.BOARD_SIZE):
-                if state.cells[row][col] == caro.EMPTY_CELL:
-                    all_moves.add((row, col))
-                    continue
-                for dr in radius:
-                    for dc in radius:
-                        p = (row + dr, col + dc)
-                        if (0 <= p[0] < caro.BOARD_SIZE and 0 <= p[1] < caro.BOARD_SIZE) \
-                                and state.cells[p[0]][p[1]] == caro.EMPTY_CELL:
-                            in_range.add(p)
-
-        out_range = all_moves - in_range
-        moves_1 = list(in_range)
-        moves_2 = random.sample(list(out_range), min(self.random_move, len(out_range)))
+        # empty cells within search radius, maintained by the state (see caro.CandidateMoves)
+        candidates = caro.CandidateMoves.of(state, self.search_radius)
+        moves_1 = list(candidates.moves)
+
+        # random moves outside search radius
+        n_out_range = state.empty_count - len(moves_1)
+        n_random = min(self.random_move, n_out_range)
+        if n_random == 0:
+            return moves_1
+        if n_out_range <= 2 * n_random:
+            out_range = [p for p in state.get_empty_positions() if not candidates.is_in_range(p)]
+            moves_2 = random.sample(out_range, n_random)
+        else:
+            # most empty cells are out of range => pick random cells until enough moves are found
+            moves_2 = set()
+            while len(moves_2) < n_random:
+                p = (random.randrange(caro.BOARD_SIZE), random.randrange(caro.BOARD_SIZE))
+                if state.get(p) == caro.EMPTY_CELL and not candidates.is_in_range(p):
+                    moves_2.add(p)
+            moves_2 = list(moves_2)
         return moves_1 + moves_2
 
     def minimax(
@@ -58,71 +175,401 @@ class MiniMax(caro.AI):
         :param beta:
         :return: tuple(best eval, depth limit)
         """
-        if depth_limit == 0 or state.status() != caro.NOT_FINISH:
+        self.node_count += 1
+        if depth_limit == 0:
             return self.evaluate_function(state, current_turn), depth_limit
+        if self.stats is not None:
+            t = time.perf_counter()
+            status = state.status()
+            self.stats.add_call('status', time.perf_counter() - t)
+        else:
+            status = state.status()
+        if status != caro.NOT_FINISH:
+            return self.evaluate_function(state, current_turn), depth_limit
+        if (self.deadline is not None and time.perf_counter() >= self.deadline) or self.stop_requested \
+                or (self._stop_flag is not None and self._stop_flag.value):
+            raise SearchTimeout()
+
+        # transposition table lookup
+        table = self.transposition_table
+        key = state.hash ^ caro.ZOBRIST_TURN_KEYS[current_turn]
+        alpha_origin, beta_origin = alpha, beta
+        hint_move = None
+        if table is not None:
+            entry = self._tt_get(key)
+            if entry is not None:
+                if entry.depth >= depth_limit:
+                    score_depth = depth_limit - entry.distance
+                    if entry.flag == tt.EXACT:
+                        return entry.score, score_depth
+                    elif entry.flag == tt.LOWER_BOUND:
+                        alpha = max(alpha, entry.score)
+                    elif entry.flag == tt.UPPER_BOUND:
+                        beta = min(beta, entry.score)
+                    if beta <= alpha:
+                        return entry.score, score_depth
+                hint_move = entry.best_move
+
+        moves = self.find_valid_moves(state)
+        ply = self.root_depth - depth_limit
+        if self.move_ordering is not None:
+            moves = self._order(state, moves, current_turn, ply, depth_limit)
+        # search the stored best move first
+        if hint_move is not None and hint_move in moves:
+            moves.remove(hint_move)
+            moves.insert(0, hint_move)
 
         # x turn => find max eval
         if current_turn == caro.X_PIECE:
             best_eval = float('-inf')
             best_depth = 0
-            for move in self.find_valid_moves(state):
+            best_move = None
+            for i in range(len(moves)):
+                move = moves[i]
                 state.put(current_turn, move)
-                current_eval, current_depth = self.minimax(state, caro.O_PIECE, depth_limit - 1, alpha, beta)
+                current_eval, current_depth = self.search_child(state, caro.O_PIECE, depth_limit - 1, alpha, beta, i > 0)
                 state.put(caro.EMPTY_CELL, move)
                 if (best_eval < current_eval) or (best_eval == current_eval and best_depth < current_depth):
                     best_eval = current_eval
                     best_depth = current_depth
+                    best_move = move
                 alpha = max(alpha, best_eval)
 
                 if beta <= alpha:
+                    if self.move_ordering is not None:
+                        self.move_ordering.record_cutoff(move, ply, depth_limit)
+                    if self.stats is not None:
+                        self.stats.record_cutoff(ply)
                     break
-            return best_eval, best_depth
 
         # o turn =< find min eval
         else:
             best_eval = float('inf')
             best_depth = 0
-            for move in self.find_valid_moves(state):
+            best_move = None
+            for i in range(len(moves)):
+                move = moves[i]
                 state.put(current_turn, move)
-                current_eval, current_depth = self.minimax(state, caro.X_PIECE, depth_limit - 1, alpha, beta)
+                current_eval, current_depth = self.search_child(state, caro.X_PIECE, depth_limit - 1, alpha, beta, i > 0)
                 state.put(caro.EMPTY_CELL, move)
                 if (best_eval > current_eval) or (best_eval == current_eval and best_depth < current_depth):
                     best_eval = current_eval
                     best_depth = current_depth
+                    best_move = move
                 beta = min(beta, best_eval)
 
                 if beta <= alpha:
+                    if self.move_ordering is not None:
+                        self.move_ordering.record_cutoff(move, ply, depth_limit)
+                    if self.stats is not None:
+                        self.stats.record_cutoff(ply)
                     break
-            return best_eval, best_depth
 
-    def decide_move(self, state: caro.BoardState, current_turn: str) -> tuple[int, int]:
+        # transposition table store
+        if table is not None:
+            if best_eval <= alpha_origin:
+                flag = tt.UPPER_BOUND
+            elif best_eval >= beta_origin:
+                flag = tt.LOWER_BOUND
+            else:
+                flag = tt.EXACT
+            table.put(key, depth_limit, flag, best_eval, depth_limit - best_depth, best_move)
+        return best_eval, best_depth
 
-        moves = self.find_valid_moves(state)
-        random.shuffle(moves)
+    def search_child(
+            self,
+            state: caro.BoardState,
+            current_turn: str,
+            depth_limit: int,
+            alpha: int | float,
+            beta: int | float,
+            scout: bool
+    ) -> tuple[int | float, int]:
+        """
+        Search the node after a move. In 'pvs' mode, a node with scout = True (not the first move of its parent)
+        is first searched with a null window, which only tells if it is better than the best move so far.
+        :param current_turn: player to move in the child node
+        :return: same as minimax()
+        """
+        if not scout or self.search_mode != 'pvs':
+            return self.minimax(state, current_turn, depth_limit, alpha, beta)
+        # parent is x => child can only raise alpha
+        if current_turn == caro.O_PIECE:
+            if alpha == float('-inf') or alpha + self.null_window >= beta:
+                return self.minimax(state, current_turn, depth_limit, alpha, beta)
+            current_eval, current_depth = self.minimax(state, current_turn, depth_limit, alpha, alpha + self.null_window)
+        # parent is o => child can only lower beta
+        else:
+            if beta == float('inf') or beta - self.null_window <= alpha:
+                return self.minimax(state, current_turn, depth_limit, alpha, beta)
+            current_eval, current_depth = self.minimax(state, current_turn, depth_limit, beta - self.null_window, beta)
+        if current_eval <= alpha or current_eval >= beta:
+            return current_eval, current_depth
+        return self.minimax(state, current_turn, depth_limit, alpha, beta)
+
+    def search_root(
+            self,
+            state: caro.BoardState,
+            current_turn: str,
+            moves: list[tuple[int, int]],
+            depth: int,
+            alpha: int | float = float('-inf'),
+            beta: int | float = float('inf')
+    ) -> tuple[tuple[int, int], int | float, int]:
+        """
+        Search every root move to the given depth.
+        :param moves: root moves, searched in order
+        :param alpha, beta: root window, 'pvs' mode only (see aspiration_window)
+        :return: tuple(best move, best eval, best depth)
+        """
+        if self.workers > 1:
+            return self.search_root_parallel(state, current_turn, moves, depth)
+        self.root_depth = depth
         best_move = moves[0]
         best_eval = float('-inf') if current_turn == caro.X_PIECE else float("inf")
         best_depth = 0
         opponent = caro.O_PIECE if current_turn == caro.X_PIECE else caro.X_PIECE
+        pvs = self.search_mode == 'pvs'
 
-        for move in moves:
+        for i in range(len(moves)):
+            move = moves[i]
             state.put(current_turn, move)
-            current_eval, current_depth = self.minimax(state, opponent, self.depth - 1)
+            if pvs:
+                current_eval, current_depth = self.search_child(state, opponent, depth - 1, alpha, beta, i > 0)
+            else:
+                current_eval, current_depth = self.minimax(state, opponent, depth - 1)
             state.put(caro.EMPTY_CELL, move)
 
             # x turn => find max eval
             if current_turn == caro.X_PIECE:
-                if (best_eval < current_eval) or (best_eval == current_eval and best_depth < current_depth):
+                # with the root bound, an eval equal to alpha may only be an upper bound => no depth tie-break
+                if (best_eval < current_eval) or (best_eval == current_eval and best_depth < current_depth and (not pvs or current_eval > alpha)):
                     best_eval = current_eval
                     best_depth = current_depth
                     best_move = move
+                if pvs:
+                    alpha = max(alpha, best_eval)
+                    if beta <= alpha:
+                        break
             # o turn => find min eval
             else:
-                if (best_eval > current_eval) or (best_eval == current_eval and best_depth < current_depth):
+                if (best_eval > current_eval) or (best_eval == current_eval and best_depth < current_depth and (not pvs or current_eval < beta)):
                     best_eval = current_eval
                     best_depth = current_depth
                     best_move = move
+                if pvs:
+                    beta = min(beta, best_eval)
+                    if beta <= alpha:
+                        break
+        return best_move, best_eval, best_depth
+
+    def search_root_window(
+            self,
+            state: caro.BoardState,
+            current_turn: str,
+            moves: list[tuple[int, int]],
+            depth: int,
+            previous_eval: int | float | None
+    ) -> tuple[tuple[int, int], int | float, int]:
+        """
+        search_root with an aspiration window around the eval of the previous iteration,
+        searched again with a full window if the eval falls outside of it.
+        """
+        if self.search_mode != 'pvs' or self.aspiration_window == 0 or self.workers > 1 \
+                or previous_eval is None or previous_eval in (float('inf'), float('-inf')):
+            return self.search_root(state, current_turn, moves, depth)
+        alpha = previous_eval - self.aspiration_window
+        beta = previous_eval + self.aspiration_window
+        result = self.search_root(state, current_turn, moves, depth, alpha, beta)
+        if result[1] <= alpha or result[1] >= beta:
+            result = self.search_root(state, current_turn, moves, depth)
+        return result
+
+    def search_root_parallel(
+            self,
+            state: caro.BoardState,
+            current_turn: str,
+            moves: list[tuple[int, int]],
+            depth: int
+    ) -> tuple[tuple[int, int], int | float, int]:
+        """
+        Same as search_root, but the root moves are searched by `workers` processes.
+        The best eval found so far is shared with the workers, so the searches started later
+        can prune with it (alpha for X, beta for O). stop() is seen by the running workers through a shared flag.
+        """
+        if self._pool is None:
+            self._root_bound = multiprocessing.Value('d', 0.0)
+            self._stop_flag = multiprocessing.Value('b', 0, lock=False)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_root_worker,
+                initargs=(self, self._root_bound, self._stop_flag)
+            )
+        # clear the flag, then read stop_requested: a stop() between the two sets it again
+        self._stop_flag.value = 0
+        if self.stop_requested:
+            self._stop_flag.value = 1
+        self._root_bound.value = float('-inf') if current_turn == caro.X_PIECE else float('inf')
+        # time.perf_counter() is local to a process => send the deadline as wall clock time
+        wall_deadline = None
+        if self.deadline is not None:
+            wall_deadline = time.time() + (self.deadline - time.perf_counter())
+
+        root = state.clone()
+        futures = [
+            self._pool.submit(_search_root_move, root, current_turn, move, depth, wall_deadline, self._search_id)
+            for move in moves
+        ]
+        best_move = moves[0]
+        best_eval = float('-inf') if current_turn == caro.X_PIECE else float("inf")
+        best_depth = 0
+        try:
+            for future in as_completed(futures):
+                move, current_eval, current_depth, bound, node_count, stats = future.result()
+                self.node_count += node_count
+                if self.stats is not None and stats is not None:
+                    self.stats.merge(stats)
+                if move is None or self.stop_requested:
+                    raise SearchTimeout()
+
+                # an eval equal to the bound it was searched with may only be an upper (lower) bound
+                # => it can not replace the best move on the depth tie-break
+                if current_turn == caro.X_PIECE:
+                    if (best_eval < current_eval) or (best_eval == current_eval and best_depth < current_depth and current_eval > bound):
+                        best_eval = current_eval
+                        best_depth = current_depth
+                        best_move = move
+                    with self._root_bound.get_lock():
+                        self._root_bound.value = max(self._root_bound.value, best_eval)
+                else:
+                    if (best_eval > current_eval) or (best_eval == current_eval and best_depth < current_depth and current_eval < bound):
+                        best_eval = current_eval
+                        best_depth = current_depth
+                        best_move = move
+                    with self._root_bound.get_lock():
+                        self._root_bound.value = min(self._root_bound.value, best_eval)
+        finally:
+            for future in futures:
+                future.cancel()
+        return best_move, best_eval, best_depth
+
+    def decide_move(self, state: caro.BoardState, current_turn: str) -> tuple[int, int]:
+        if self.stats is None:
+            return self._decide_move(state, current_turn)
+        self.stats.reset()
+        t = time.perf_counter()
+        try:
+            return self._decide_move(state, current_turn)
+        finally:
+            self.stats.nodes = self.node_count
+            self.stats.total_time = time.perf_counter() - t
+
+    def _decide_move(self, state: caro.BoardState, current_turn: str) -> tuple[int, int]:
+        self._search_id += 1
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        self.node_count = 0
+
+        # forcing positions: no need to search
+        if self.threat_search is not None:
+            move = threats.forced_move(state, current_turn, self.threat_search, self._find_threats)
+            if move is not None:
+                return move
+
+        moves = self.find_valid_moves(state)
+        random.shuffle(moves)
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+            moves = self._order(state, moves, current_turn, 0, self.depth)
+        if self.time_limit is None and self.search_mode != 'pvs':
+            if self.stats is not None:
+                self.stats.depth = self.depth
+            return self.search_root(state, current_turn, moves, self.depth)[0]
+
+        # iterative deepening: depth 1 is always completed unless stop() is called, deeper iterations stop at the deadline
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        # a timeout leaves pieces on the board => search on a copy
+        state = state.clone()
+        win = float('inf') if current_turn == caro.X_PIECE else float('-inf')
+        best_move = moves[0]
+        best_eval = None
+        for depth in range(1, self.depth + 1):
+            self.deadline = deadline if depth > 1 else None
+            try:
+                best_move, best_eval, _ = self.search_root_window(state, current_turn, moves, depth, best_eval)
+            except SearchTimeout:
+                # stopped (see stop()) before depth 1 finished => no searched move, the caller decides
+                if depth == 1:
+                    raise
+                break
+            finally:
+                self.deadline = None
+            if self.stats is not None:
+                self.stats.depth = depth
+            if best_eval == win or (deadline is not None and time.perf_counter() >= deadline):
+                break
+            # search the best move of the previous iteration first
+            moves.remove(best_move)
+            moves.insert(0, best_move)
         return best_move
 
+# parallel root search: state of a worker process
+_worker_agent = None
+_worker_root_bound = None
+_worker_search_id = None # search id of the last task, see MiniMax._search_id
+
+def _init_root_worker(agent:MiniMax, root_bound, stop_flag):
+    global _worker_agent, _worker_root_bound, _worker_search_id
+    agent.workers = 1
+    agent._stop_flag = stop_flag
+    _worker_agent = agent
+    _worker_root_bound = root_bound
+    _worker_search_id = None
+
+def _search_root_move(
+        state: caro.BoardState,
+        current_turn: str,
+        move: tuple[int, int],
+        depth: int,
+        wall_deadline: float | None,
+        search_id: int
+)->tuple[tuple[int, int] | None, int | float, int, int | float, int, SearchStats | None]:
+    """
+    Search one root move in a worker process.
+    :param search_id: decide_move call of the task, the worker's transposition table and move ordering
+        start a new search when it changes (as the agent's own do in decide_move)
+    :return: tuple(move or None if the time is up, eval, depth, root bound used, node count, stats or None)
+    """
+    global _worker_search_id
+    agent = _worker_agent
+    if search_id != _worker_search_id:
+        _worker_search_id = search_id
+        if agent.transposition_table is not None:
+            agent.transposition_table.new_search()
+        if agent.move_ordering is not None:
+            agent.move_ordering.new_search()
+    agent.root_depth = depth
+    agent.node_count = 0
+    if agent.stats is not None:
+        agent.stats.reset()
+    agent.deadline = None
+    if wall_deadline is not None:
+        agent.deadline = time.perf_counter() + (wall_deadline - time.time())
+    bound = _worker_root_bound.value
+    if current_turn == caro.X_PIECE:
+        opponent, alpha, beta = caro.O_PIECE, bound, float('inf')
+    else:
+        opponent, alpha, beta = caro.X_PIECE, float('-inf'), bound
+
+    state.put(current_turn, move)
+    try:
+        current_eval, current_depth = agent.minimax(state, opponent, depth - 1, alpha, beta)
+    except SearchTimeout:
+        return None, 0, 0, bound, agent.node_count, agent.stats
+    finally:
+        agent.deadline = None
+    return move, current_eval, current_depth, bound, agent.node_count, agent.stats
+
 # test
 if __name__ == '__main__':
     from app import App
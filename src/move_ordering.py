@@ -0,0 +1,213 @@
+import caro
+from caro.bit_board_state import CELL_BITS
+
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# threat levels made by putting a piece on a cell
+NONE = 0
+TWO = 1        # 2 in a row, open at both ends
+OPEN_THREE = 2 # 3 in a row, open at both ends
+FOUR = 3       # 4 in a row, open at one end
+OPEN_FOUR = 4  # 4 in a row, open at both ends
+FIVE = 5       # win
+
+# move priority by threat level: own threats first, then blocking the opponent's threats
+ATTACK_PRIORITY = {FIVE: 10, OPEN_FOUR: 8, FOUR: 6, OPEN_THREE: 5, TWO: 2, NONE: 0}
+DEFENCE_PRIORITY = {FIVE: 9, OPEN_FOUR: 7, FOUR: 4, OPEN_THREE: 3, TWO: 1, NONE: 0}
+
+def count_line_bits(own:int, occupied:int, position:tuple[int, int], direction:tuple[int, int])->tuple[int, int]:
+    """
+    Count the pieces in a row through position, as if the piece was put at position.
+    :param own: bits of the piece (see caro.BitBoardState)
+    :param occupied: bits of both pieces
+    :return: tuple(number of pieces in a row, number of empty ends (0, 1 or 2))
+    """
+    count = 1
+    open_ends = 0
+    for sign in (1, -1):
+        dr, dc = sign * direction[0], sign * direction[1]
+        r, c = position[0] + dr, position[1] + dc
+        while 0 <= r < caro.BOARD_SIZE and 0 <= c < caro.BOARD_SIZE and own & CELL_BITS[r][c]:
+            count += 1
+            r += dr
+            c += dc
+        if 0 <= r < caro.BOARD_SIZE and 0 <= c < caro.BOARD_SIZE and not (occupied & CELL_BITS[r][c]):
+            open_ends += 1
+    return count, open_ends
+
+def threat_level_bits(own:int, occupied:int, position:tuple[int, int])->int:
+    """
+    :return: highest threat level (NONE ... FIVE) made by putting the piece of `own` at position
+    """
+    best = NONE
+    for d in DIRECTIONS:
+        count, open_ends = count_line_bits(own, occupied, position, d)
+        best = max(best, _line_level(count, open_ends))
+        if best == FIVE:
+            return FIVE
+    return best
+
+def _line_level(count:int, open_ends:int)->int:
+    """
+    :return: threat level of a line of count pieces with open_ends empty ends
+    """
+    if count >= caro.WIN_LENGTH:
+        return FIVE
+    if count == caro.WIN_LENGTH - 1:
+        return OPEN_FOUR if open_ends == 2 else FOUR if open_ends == 1 else NONE
+    if count == caro.WIN_LENGTH - 2:
+        return OPEN_THREE if open_ends == 2 else NONE
+    if count == caro.WIN_LENGTH - 3:
+        return TWO if open_ends == 2 else NONE
+    return NONE
+
+def cells_bits(cells:list[list[str]])->tuple[int, int]:
+    """
+    :param cells: state.cells
+    :return: tuple(x bits, o bits), bit masks like caro.BitBoardState.x_bits / o_bits
+    """
+    x_bits = 0
+    o_bits = 0
+    for row, line in enumerate(cells):
+        bits = CELL_BITS[row]
+        for column, cell in enumerate(line):
+            if cell == caro.X_PIECE:
+                x_bits |= bits[column]
+            elif cell == caro.O_PIECE:
+                o_bits |= bits[column]
+    return x_bits, o_bits
+
+def board_bits(state:caro.BoardState|caro.BitBoardState)->tuple[int, int]:
+    """
+    :return: tuple(x bits, o bits) of the state
+    """
+    if isinstance(state, caro.BitBoardState):
+        return state.x_bits, state.o_bits
+    return cells_bits(state.cells)
+
+def _cell_masks(cells:list[list[str]], piece:str)->tuple[int, int]:
+    """
+    :return: tuple(bits of piece, bits of both pieces)
+    """
+    x_bits, o_bits = cells_bits(cells)
+    return (x_bits if piece == caro.X_PIECE else o_bits), x_bits | o_bits
+
+def count_line(cells:list[list[str]], position:tuple[int, int], piece:str, direction:tuple[int, int])->tuple[int, int]:
+    """
+    count_line_bits() on cells.
+    :param cells: state.cells
+    """
+    own, occupied = _cell_masks(cells, piece)
+    return count_line_bits(own, occupied, position, direction)
+
+def threat_level(cells:list[list[str]], position:tuple[int, int], piece:str)->int:
+    """
+    threat_level_bits() on cells.
+    :param cells: state.cells
+    """
+    own, occupied = _cell_masks(cells, piece)
+    return threat_level_bits(own, occupied, position)
+
+class MoveOrdering:
+    """
+    Base class of move ordering heuristics used by MiniMax: keeps the moves in their original order.
+
+    Subclasses can override:
+        - new_search(): called at the start of each decision
+        - order(): sort the moves of a node, best moves first
+        - record_cutoff(): called when a move causes an alpha-beta cutoff
+    """
+    def new_search(self):
+        pass
+
+    def order(
+            self,
+            state:caro.BoardState,
+            moves:list[tuple[int, int]],
+            current_turn:str,
+            ply:int,
+            depth_limit:int
+    )->list[tuple[int, int]]:
+        """
+        :param ply: distance from the root (root = 0)
+        :param depth_limit: remaining depth of the node
+        :return: ordered moves
+        """
+        return moves
+
+    def record_cutoff(self, move:tuple[int, int], ply:int, depth_limit:int):
+        pass
+
+class HeuristicOrdering(MoveOrdering):
+    """
+    Order moves by:
+        1. threats: immediate wins, blocks of the opponent's wins, open fours, fours, open threes, ...
+        2. killer moves: the last moves that caused a cutoff at the same ply
+        3. history heuristic: moves that caused cutoffs anywhere, weighted by depth_limit^2
+    Each heuristic can be turned off to compare orderings.
+
+    Threat detection costs more than an evaluation (which is a lookup, see evaluate.LineScores), so
+    threats are only used at nodes with depth_limit >= threat_min_depth.
+    """
+    def __init__(
+            self,
+            threats:bool=True,
+            killers:bool=True,
+            history:bool=True,
+            n_killers:int=2,
+            threat_min_depth:int=2
+    ):
+        self.threats = threats
+        self.threat_min_depth = threat_min_depth
+        self.killers = killers
+        self.history = history
+        self.n_killers = n_killers if n_killers >= 1 else 1
+        self.killer_moves = [] # killer_moves[ply] = list of moves, most recent first
+        self.history_scores = dict()
+
+    def new_search(self):
+        # killers belong to one search tree, history is kept but aged
+        self.killer_moves = []
+        for move in self.history_scores:
+            self.history_scores[move] //= 2
+
+    def order(
+            self,
+            state:caro.BoardState,
+            moves:list[tuple[int, int]],
+            current_turn:str,
+            ply:int,
+            depth_limit:int
+    )->list[tuple[int, int]]:
+        use_threats = self.threats and depth_limit >= self.threat_min_depth
+        if use_threats:
+            # threats are read from bit masks, built once per node for a caro.BoardState
+            x_bits, o_bits = board_bits(state)
+            occupied = x_bits | o_bits
+            own_bits = x_bits if current_turn == caro.X_PIECE else o_bits
+            opponent_bits = occupied ^ own_bits
+            attack = lambda move: threat_level_bits(own_bits, occupied, move)
+            defence = lambda move: threat_level_bits(opponent_bits, occupied, move)
+        killers = self.killer_moves[ply] if (self.killers and ply < len(self.killer_moves)) else []
+
+        def key(move):
+            threat = 0
+            if use_threats:
+                threat = max(ATTACK_PRIORITY[attack(move)], DEFENCE_PRIORITY[defence(move)])
+            killer = (len(killers) - killers.index(move)) if move in killers else 0
+            history = self.history_scores.get(move, 0) if self.history else 0
+            return threat, killer, history
+
+        return sorted(moves, key=key, reverse=True)
+
+    def record_cutoff(self, move:tuple[int, int], ply:int, depth_limit:int):
+        if self.killers:
+            while len(self.killer_moves) <= ply:
+                self.killer_moves.append([])
+            killers = self.killer_moves[ply]
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[self.n_killers:]
+        if self.history:
+            self.history_scores[move] = self.history_scores.get(move, 0) + depth_limit * depth_limit
@@ -0,0 +1,97 @@
+import threading
+import caro
+from minimax import MiniMax, SearchTimeout
+
+class Ponderer:
+    """
+    Search on the opponent's time. While the opponent thinks, a background thread searches the agent's
+    answers to the opponent's most likely moves. The agent's transposition table and move ordering
+    stay warm, and if the opponent plays one of the predicted moves, the answer is ready at once.
+
+    The agent must not be used while the ponderer runs: call stop() first.
+
+    Example:
+        ponderer = Ponderer(agent)
+        ponderer.start(state, opponent_piece)  # after the agent moved
+        ...
+        ponderer.stop()
+        move = ponderer.answer(opponent_move)  # None => not searched, use agent.decide_move
+    """
+    def __init__(self, agent:MiniMax, n_replies:int=3):
+        """
+        :param n_replies: number of predicted opponent moves to search
+        """
+        self.agent = agent
+        self.n_replies = n_replies if n_replies >= 1 else 1
+        self.answers = dict() # opponent move => answer of the agent
+        self._thread = None
+        self._stopped = False
+
+    def predict_replies(self, state:caro.BoardState, piece:str)->list[tuple[int, int]]:
+        """
+        :param piece: opponent, to move
+        :return: the opponent's moves with the best evaluation after one move, best first
+        """
+        agent_piece = caro.O_PIECE if piece == caro.X_PIECE else caro.X_PIECE
+        scores = []
+        for move in self.agent.find_valid_moves(state):
+            state.put(piece, move)
+            score = self.agent.evaluate_function(state, agent_piece)
+            state.put(caro.EMPTY_CELL, move)
+            scores.append((score, move))
+        # x maximizes the evaluation, o minimizes it
+        scores.sort(key=lambda s: s[0], reverse=(piece == caro.X_PIECE))
+        return [move for _, move in scores[:self.n_replies]]
+
+    def start(self, state:caro.BoardState, piece:str):
+        """
+        Start pondering in a background thread (the previous pondering is stopped).
+        :param state: position after the agent's move, it is copied
+        :param piece: opponent, to move
+        """
+        self.stop()
+        self.answers = dict()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, args=[state.clone(), piece], daemon=True)
+        self._thread.start()
+
+    def _run(self, state:caro.BoardState, piece:str):
+        agent_piece = caro.O_PIECE if piece == caro.X_PIECE else caro.X_PIECE
+        if state.status() != caro.NOT_FINISH:
+            return
+        for reply in self.predict_replies(state, piece):
+            # reset the flag, then check ours: a stop() between the two is seen by one of them
+            self.agent.stop_requested = False
+            if self._stopped:
+                return
+            next_state = state.clone()
+            next_state.put(piece, reply)
+            if next_state.status() != caro.NOT_FINISH:
+                continue
+            try:
+                move = self.agent.decide_move(next_state, agent_piece)
+            except SearchTimeout:
+                return
+            # a stopped search returns the best move of an unfinished search => not an answer
+            if self._stopped:
+                return
+            self.answers[reply] = move
+
+    def stop(self):
+        """
+        Stop pondering and wait for the background thread. The searches already finished are kept.
+        """
+        if self._thread is None:
+            return
+        self._stopped = True
+        self.agent.stop()
+        self._thread.join()
+        self._thread = None
+        self.agent.stop_requested = False
+
+    def answer(self, move:tuple[int, int])->tuple[int, int] | None:
+        """
+        :param move: move played by the opponent
+        :return: answer found while pondering, None => move was not searched
+        """
+        return self.answers.get((move[0], move[1]))
@@ -0,0 +1,125 @@
+import json
+import time
+from typing import Any, Callable
+
+# timed phases of a decision
+PHASES = ['threat search', 'find valid moves', 'ordering', 'evaluate', 'status']
+
+class TimedCall:
+    """
+    Callable wrapper that adds the time and number of calls of `function` to a phase of SearchStats.
+    Picklable if `function` is picklable (e.g. a module level function or a method of a picklable object).
+    """
+    def __init__(self, stats:'SearchStats', phase:str, function:Callable):
+        self.stats = stats
+        self.phase = phase
+        self.function = function
+
+    def __call__(self, *args, **kwargs):
+        t = time.perf_counter()
+        try:
+            return self.function(*args, **kwargs)
+        finally:
+            self.stats.add_call(self.phase, time.perf_counter() - t)
+
+class CountedProbe:
+    """
+    Wrapper of TranspositionTable.get that counts probes and hits in SearchStats.
+    """
+    def __init__(self, stats:'SearchStats', get:Callable):
+        self.stats = stats
+        self.get = get
+
+    def __call__(self, key:int):
+        entry = self.get(key)
+        self.stats.tt_probes += 1
+        if entry is not None:
+            self.stats.tt_hits += 1
+        return entry
+
+class SearchStats:
+    """
+    Statistics of one MiniMax decision (see MiniMax collect_stats):
+        - nodes: minimax calls, leaves: evaluate_function calls
+        - cutoffs[ply]: alpha-beta cutoffs at distance ply from the root
+        - tt_probes, tt_hits: transposition table lookups
+        - phase_time[phase], phase_calls[phase]: time spent in (and calls of) each phase of PHASES.
+          Phases can overlap, e.g. evaluate_function may call state.status().
+        - depth: depth of the last completed iteration, total_time: time of the whole decision
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes = 0
+        self.cutoffs = []
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.phase_time = {phase: 0.0 for phase in PHASES}
+        self.phase_calls = {phase: 0 for phase in PHASES}
+        self.depth = 0
+        self.total_time = 0.0
+
+    @property
+    def leaves(self)->int:
+        return self.phase_calls['evaluate']
+
+    @property
+    def branching_factor(self)->float:
+        """
+        :return: average number of children searched per expanded node
+        """
+        expanded = self.phase_calls['find valid moves']
+        return self.nodes / expanded if expanded > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self)->float:
+        return self.tt_hits / self.tt_probes if self.tt_probes > 0 else 0.0
+
+    def add_call(self, phase:str, seconds:float):
+        """
+        Count one call of a phase (see PHASES) that took `seconds`
+        """
+        self.phase_time[phase] += seconds
+        self.phase_calls[phase] += 1
+
+    def record_cutoff(self, ply:int):
+        while len(self.cutoffs) <= ply:
+            self.cutoffs.append(0)
+        self.cutoffs[ply] += 1
+
+    def merge(self, other:'SearchStats'):
+        """
+        Add the counters of `other` (e.g. the stats of a worker process), times excluding total_time.
+        """
+        self.nodes += other.nodes
+        while len(self.cutoffs) < len(other.cutoffs):
+            self.cutoffs.append(0)
+        for ply in range(len(other.cutoffs)):
+            self.cutoffs[ply] += other.cutoffs[ply]
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        for phase in PHASES:
+            self.phase_time[phase] += other.phase_time[phase]
+            self.phase_calls[phase] += other.phase_calls[phase]
+
+    def to_dict(self)->dict[str, Any]:
+        return {
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'cutoffs by ply': list(self.cutoffs),
+            'branching factor': self.branching_factor,
+            'tt probes': self.tt_probes,
+            'tt hits': self.tt_hits,
+            'tt hit rate': self.tt_hit_rate,
+            'depth': self.depth,
+            'total time': self.total_time,
+            'phase time': dict(self.phase_time),
+            'phase calls': dict(self.phase_calls)
+        }
+
+    def to_json(self, indent:int|None=None)->str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def __str__(self):
+        return self.to_json(indent=4)
@@ -0,0 +1,182 @@
+"""
+Threat-space search: VCF (victory by continuous fours).
+
+The attacker only plays fours (moves after which it threatens to complete a five), so every
+defender reply is forced: the defender must take the only cell that completes the five.
+Forcing lines are narrow, so they can be searched much deeper than a full width alpha-beta.
+
+The search works on bit masks (see caro.bit_board_state): the pieces of each player are the
+bits of an int and the threats are read from the WIN_LENGTH-cell windows (WIN_MASKS).
+"""
+import caro
+from typing import Callable
+from caro.bit_board_state import CELL_BITS, WIN_MASKS, CELL_WIN_MASKS
+
+def to_bits(state:caro.BoardState|caro.BitBoardState, piece:str)->int:
+    """
+    :return: pieces of `piece` as a bit mask (bit of (row, column) = row * BOARD_SIZE + column)
+    """
+    if isinstance(state, caro.BitBoardState):
+        return state.x_bits if piece == caro.X_PIECE else state.o_bits
+    bits = 0
+    cells = state.cells
+    for row in range(caro.BOARD_SIZE):
+        for column in range(caro.BOARD_SIZE):
+            if cells[row][column] == piece:
+                bits |= CELL_BITS[row][column]
+    return bits
+
+def to_position(bit:int)->tuple[int, int]:
+    """
+    :param bit: mask of one cell
+    :return: tuple[row, column]
+    """
+    return divmod(bit.bit_length() - 1, caro.BOARD_SIZE)
+
+def five_cells(own:int, opponent:int, masks:list[int]=WIN_MASKS)->set[int]:
+    """
+    :param masks: windows to check (all windows by default)
+    :return: cells (bit masks) where `own` completes a five, i.e. the threats of `own`
+    """
+    cells = set()
+    for mask in masks:
+        if not (opponent & mask) and (own & mask).bit_count() == caro.WIN_LENGTH - 1:
+            cells.add(mask & ~own)
+    return cells
+
+def three_windows(own:int, opponent:int, masks:list[int]=WIN_MASKS)->list[int]:
+    """
+    :return: windows with WIN_LENGTH - 2 pieces of `own` and no opponent piece:
+        playing one of their two empty cells makes a four
+    """
+    return [mask for mask in masks if not (opponent & mask) and (own & mask).bit_count() == caro.WIN_LENGTH - 2]
+
+class VCFSearch:
+    """
+    Depth first search of continuous fours, with a table of the positions already proven to fail.
+
+    Example:
+        search = VCFSearch(max_depth=10)
+        moves = search.find(state, caro.X_PIECE)
+        if moves is not None:
+            # moves = [attacker move, defender reply, attacker move, ...], ends with the five
+    """
+    def __init__(self, max_depth:int=10, max_nodes:int=20000):
+        """
+        :param max_depth: maximum number of attacker moves in a sequence
+        :param max_nodes: stop (as if no win was found) after searching this many positions
+        """
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.node_count = 0
+        self._failed = dict() # positions without VCF: (own, opp) => depth searched
+
+    def find(self, state:caro.BoardState|caro.BitBoardState, piece:str)->list[tuple[int, int]] | None:
+        """
+        :param piece: attacker, to move
+        :return: winning sequence of moves (attacker first), or None if no VCF was found
+        """
+        opponent = caro.O_PIECE if piece == caro.X_PIECE else caro.X_PIECE
+        own = to_bits(state, piece)
+        opp = to_bits(state, opponent)
+        self.node_count = 0
+        self._failed = dict()
+
+        # immediate win
+        wins = five_cells(own, opp)
+        if len(wins) > 0:
+            return [to_position(min(wins))]
+        # the opponent's fours must be blocked first
+        blocks = five_cells(opp, own)
+        if len(blocks) > 1:
+            return None
+        sequence = self._search(own, opp, three_windows(own, opp), blocks.pop() if blocks else 0, self.max_depth)
+        if sequence is None:
+            return None
+        return [to_position(bit) for bit in sequence]
+
+    def _search(self, own:int, opp:int, threes:list[int], must_play:int, depth:int)->list[int] | None:
+        """
+        Attacker to move, it has no five cell.
+        :param threes: three_windows(own, opp)
+        :param must_play: cell that blocks a four of the defender, 0 => none
+        :return: list of cells (bit masks) or None
+        """
+        if depth == 0 or self.node_count >= self.max_nodes or self._failed.get((own, opp), 0) >= depth:
+            return None
+        self.node_count += 1
+
+        # candidate fours, cells that make several fours first
+        counts = dict()
+        for mask in threes:
+            empty = mask & ~own
+            while empty:
+                bit = empty & -empty
+                empty ^= bit
+                counts[bit] = counts.get(bit, 0) + 1
+        moves = sorted(counts, key=lambda bit: (-counts[bit], bit))
+        if must_play:
+            moves = [bit for bit in moves if bit == must_play]
+
+        for move in moves:
+            new_own = own | move
+            index = move.bit_length() - 1
+            threats = five_cells(new_own, opp, CELL_WIN_MASKS[index])
+            if len(threats) == 0:
+                continue
+            if len(threats) > 1:
+                # double four: the defender can not block both (it has no four of its own,
+                # otherwise `move` would have had to block it)
+                defence = min(threats)
+                win = min(threats - {defence})
+                return [move, defence, win]
+
+            # forced reply
+            defence = threats.pop()
+            new_opp = opp | defence
+            defence_index = defence.bit_length() - 1
+            counter = five_cells(new_opp, new_own, CELL_WIN_MASKS[defence_index])
+            if len(counter) > 1:
+                continue
+            new_threes = [mask for mask in threes if not (mask & (move | defence))]
+            new_threes += [
+                mask for mask in CELL_WIN_MASKS[index]
+                if not (new_opp & mask) and (new_own & mask).bit_count() == caro.WIN_LENGTH - 2
+            ]
+            sequence = self._search(new_own, new_opp, new_threes, counter.pop() if counter else 0, depth - 1)
+            if sequence is not None:
+                return [move, defence] + sequence
+
+        self._failed[(own, opp)] = depth
+        return None
+
+def forced_move(
+        state:caro.BoardState|caro.BitBoardState,
+        piece:str,
+        search:VCFSearch|None=None,
+        find:Callable[[caro.BoardState|caro.BitBoardState, str], list[tuple[int, int]] | None]|None=None
+)->tuple[int, int] | None:
+    """
+    Move that does not need a full search:
+        1. a move that wins immediately
+        2. the block of the opponent's four
+        3. the first move of a VCF
+    :param piece: player to move
+    :param search: VCFSearch used for 3., None => skip the VCF search
+    :param find: called instead of search.find (e.g. a timed wrapper), None => search.find
+    :return: tuple[row, column] or None
+    """
+    opponent = caro.O_PIECE if piece == caro.X_PIECE else caro.X_PIECE
+    own = to_bits(state, piece)
+    opp = to_bits(state, opponent)
+    wins = five_cells(own, opp)
+    if len(wins) > 0:
+        return to_position(min(wins))
+    blocks = five_cells(opp, own)
+    if len(blocks) > 0:
+        return to_position(min(blocks))
+    if search is not None:
+        sequence = (find if find is not None else search.find)(state, piece)
+        if sequence is not None:
+            return sequence[0]
+    return None
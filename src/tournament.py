@@ -1,8 +1,21 @@
-from typing import Any
+from typing import Any, Iterator, Iterable, TextIO
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import pickle
+import random
 import warnings
 import caro
 
-def play(agent_x:caro.AI, agent_o:caro.AI, first_turn:str)->caro.GameRecord:
+def play(
+        agent_x:caro.AI,
+        agent_o:caro.AI,
+        first_turn:str,
+        move_stats:list[dict[str, Any]]|None=None
+)->caro.GameRecord:
+    """
+    :param move_stats: if not None, the search statistics of each move made by an agent that collects them
+        (e.g. MiniMax(collect_stats=True)) are appended to it: {'move': move index, 'agent': name, 'stats': dict}
+    """
     # check
     if not (isinstance(agent_x, caro.AI) and isinstance(agent_o, caro.AI)):
         raise RuntimeError("Agent must extend caro.AI")
@@ -14,16 +27,41 @@ def play(agent_x:caro.AI, agent_o:caro.AI, first_turn:str)->caro.GameRecord:
     board_state = caro.BoardState()
     game_record = caro.GameRecord(player_x_name=agent_x.name, player_o_name=agent_o.name, first_turn=first_turn)
     while board_state.status() == caro.NOT_FINISH:
-        move = player[current_turn].decide_move(board_state.clone(), current_turn)
+        agent = player[current_turn]
+        move = agent.decide_move(board_state.clone(), current_turn)
         board_state.put(current_turn, move)
         game_record.add_move(move)
+        if move_stats is not None and getattr(agent, 'stats', None) is not None:
+            move_stats.append({'move': len(game_record.moves) - 1, 'agent': agent.name, 'stats': agent.stats.to_dict()})
 
         # change turn
         current_turn = caro.X_PIECE if current_turn == caro.O_PIECE else caro.O_PIECE
 
     return game_record
 
-def match(agent_x:caro.AI, agent_o:caro.AI, number_of_game:int)->list[caro.GameRecord]:
+def write_move_stats(file:TextIO, game_id:int, record:caro.GameRecord, move_stats:list[dict[str, Any]]):
+    """
+    Write the search statistics of the moves of one game as JSON Lines, one line per move.
+    """
+    for s in move_stats:
+        line = {'game': game_id, 'player x': record.player_x, 'player o': record.player_o}
+        line.update(s)
+        file.write(json.dumps(line) + '\n')
+    file.flush()
+
+def match(
+        agent_x:caro.AI,
+        agent_o:caro.AI,
+        number_of_game:int,
+        writer:caro.GameRecordWriter|None=None,
+        stats_file:TextIO|None=None,
+        first_game_id:int=0
+)->list[caro.GameRecord]:
+    """
+    :param writer: if not None, each game record is appended to it as soon as the game is finished
+    :param stats_file: if not None, the search statistics of each move are written to it, see write_move_stats()
+    :param first_game_id: game id of the first game in stats_file
+    """
     # check
     if not (isinstance(agent_x, caro.AI) and isinstance(agent_o, caro.AI)):
         raise RuntimeError("Agent must extend caro.AI")
@@ -35,8 +73,13 @@ def match(agent_x:caro.AI, agent_o:caro.AI, number_of_game:int)->list[caro.GameR
     print(f"{agent_x.name} vs {agent_o.name}")
     for i in range(number_of_game):
         print(f"\tgame {i+1}/{number_of_game}:", end=" ")
-        record = play(agent_x, agent_o, first_turn=first_turn)
+        move_stats = [] if stats_file is not None else None
+        record = play(agent_x, agent_o, first_turn=first_turn, move_stats=move_stats)
         game_records.append(record)
+        if writer is not None:
+            writer.write(record)
+        if stats_file is not None:
+            write_move_stats(stats_file, first_game_id + i, record, move_stats)
 
         # change first turn after each game
         first_turn = caro.X_PIECE if first_turn == caro.O_PIECE else caro.O_PIECE
@@ -47,13 +90,42 @@ def match(agent_x:caro.AI, agent_o:caro.AI, number_of_game:int)->list[caro.GameR
 
     return game_records
 
-def tournament(agents:list[caro.AI], n_game:int=5)->list[caro.GameRecord]:
+def tournament(
+        agents:list[caro.AI],
+        n_game:int=5,
+        workers:int=1,
+        seed:int|None=None,
+        writer:caro.GameRecordWriter|None=None,
+        stats_file:TextIO|None=None
+)->list[caro.GameRecord]:
     """
      Run a round-robin tournament where each agent plays against every other agent.
     :param agents: list of agent
     :param n_game: Number of games played between each pair of agents.
-    :return: list[game record]
+    :param workers: Number of processes playing games at the same time (1 => play in this process).
+    :param seed: If not None, every game is played by fresh copies of the agents with its own random
+        seed, so the moves do not depend on the number of workers or the order games finish.
+    :param writer: If not None, each game record is appended to it as soon as the game is finished.
+    :param stats_file: If not None, the search statistics of each move (of agents that collect them, e.g.
+        MiniMax(collect_stats=True)) are written to it as JSON Lines, see write_move_stats().
+    :return: list[game record], in schedule order
     """
+    check_agents(agents)
+    if workers <= 1 and seed is None:
+        game_records = []
+        for i in range(len(agents)):
+            for j in range(i + 1, len(agents)):
+                game_records += match(agents[i], agents[j], n_game, writer, stats_file, len(game_records))
+        return game_records
+
+    game_records = dict()
+    for game_id, record in iter_tournament(agents, n_game, workers, seed, stats_file):
+        game_records[game_id] = record
+        if writer is not None:
+            writer.write(record)
+    return [game_records[game_id] for game_id in sorted(game_records)]
+
+def check_agents(agents:list[caro.AI]):
     # Ensure all agent names are unique
     for i in range(len(agents)):
         if not isinstance(agents[i], caro.AI):
@@ -62,80 +134,133 @@ def tournament(agents:list[caro.AI], n_game:int=5)->list[caro.GameRecord]:
             if agents[i].name == agents[j].name:
                 raise RuntimeError("Duplicate agent name")
 
-    game_records = []
-    for i in range(len(agents)):
-        for j in range(i + 1, len(agents)):
-            game_records += match(agents[i], agents[j], n_game)
-    return game_records
+def schedule_tournament(n_agent:int, n_game:int)->list[tuple[int, int, str]]:
+    """
+    Games of a round-robin tournament, in the same order as tournament() plays them serially.
+    :return: list[tuple(agent x id, agent o id, first turn)], game id = index in the list
+    """
+    games = []
+    for i in range(n_agent):
+        for j in range(i + 1, n_agent):
+            first_turn = caro.X_PIECE
+            for _ in range(n_game):
+                games.append((i, j, first_turn))
+                # change first turn after each game
+                first_turn = caro.X_PIECE if first_turn == caro.O_PIECE else caro.O_PIECE
+    return games
 
-def analyze_game_record(game_records:list[caro.GameRecord]):
-    # check
-    for r in game_records:
+def iter_tournament(
+        agents:list[caro.AI],
+        n_game:int=5,
+        workers:int=1,
+        seed:int|None=None,
+        stats_file:TextIO|None=None
+)->Iterator[tuple[int, caro.GameRecord]]:
+    """
+    Play the games of a round-robin tournament over a process pool and yield each game record as
+    soon as it is finished (not in schedule order).
+    Agents must be picklable (e.g. MiniMax with a module level evaluate function).
+    :param workers: number of processes
+    :param seed: see tournament()
+    :param stats_file: see tournament()
+    :return: iterator of tuple(game id, game record), game id is the index in schedule_tournament()
+    """
+    check_agents(agents)
+    if n_game <= 0:
+        raise RuntimeError("Number of game must > 0")
+    games = schedule_tournament(len(agents), n_game)
+    with ProcessPoolExecutor(max_workers=max(workers, 1), initializer=_init_tournament_worker, initargs=(agents, seed, stats_file is not None)) as pool:
+        futures = {pool.submit(_play_tournament_game, game_id, *games[game_id]): game_id for game_id in range(len(games))}
+        for n_finished, future in enumerate(as_completed(futures), start=1):
+            game_id = futures[future]
+            record, move_stats = future.result()
+            if stats_file is not None:
+                write_move_stats(stats_file, game_id, record, move_stats)
+            result = record.result()
+            str_result = f"{record.player_x} win" if result == caro.X_WIN else f"{record.player_o} win" if result == caro.O_WIN else "draw"
+            print(f"[{n_finished}/{len(games)}] {record.player_x} vs {record.player_o}: {str_result} after {len(record.moves)} moves")
+            yield game_id, record
+
+# parallel tournament: state of a worker process
+_worker_agents = None
+_worker_agents_data = None # pickled agents, used to make fresh copies for each seeded game
+_worker_seed = None
+_worker_move_stats = False
+
+def _init_tournament_worker(agents:list[caro.AI], seed:int|None, move_stats:bool):
+    global _worker_agents, _worker_agents_data, _worker_seed, _worker_move_stats
+    _worker_agents = agents
+    _worker_agents_data = pickle.dumps(agents) if seed is not None else None
+    _worker_seed = seed
+    _worker_move_stats = move_stats
+
+def _play_tournament_game(
+        game_id:int,
+        agent_x_id:int,
+        agent_o_id:int,
+        first_turn:str
+)->tuple[caro.GameRecord, list[dict[str, Any]] | None]:
+    """
+    :return: tuple(game record, search statistics of each move or None), see play()
+    """
+    agents = _worker_agents
+    if _worker_seed is not None:
+        # agents keep state between games (e.g. transposition table) => use fresh copies
+        agents = pickle.loads(_worker_agents_data)
+        random.seed(_worker_seed * 1_000_003 + game_id)
+    move_stats = [] if _worker_move_stats else None
+    return play(agents[agent_x_id], agents[agent_o_id], first_turn, move_stats), move_stats
+
+class RecordAggregator:
+    """
+    Statistics of game records, updated one record at a time, so records can come from any iterator
+    (e.g. caro.GameRecord.iter_file) without keeping them in memory.
+    Aggregators built from different parts of the records (e.g. by different processes) can be merged.
+
+    Example:
+        aggregator = RecordAggregator()
+        for r in caro.GameRecord.iter_file(path):
+            aggregator.add(r)
+        statistics, matches = aggregator.statistics(), aggregator.matches()
+    """
+    def __init__(self):
+        self.agent_names = [] # in order of first appearance
+        # totals[name] = {'win', 'loss', 'draw', 'moves', 'thinking time'}
+        self.totals = dict()
+        # matchups[(agent, opponent)] = {'win', 'loss', 'draw', 'moves'}, only for pairs that played
+        self.matchups = dict()
+        self.n_unfinished = 0
+
+    def _add_agent(self, name:str):
+        if name not in self.totals:
+            self.agent_names.append(name)
+            self.totals[name] = {'win': 0, 'loss': 0, 'draw': 0, 'moves': 0, 'thinking time': 0}
+
+    def _update(self, agent:str, opponent:str, result:int, n_game_moves:int, n_moves:int, thinking_time:float):
+        # result agent vs opponent: win 1, draw 0, loss -1
+        key = 'win' if result == 1 else 'loss' if result == -1 else 'draw'
+        total = self.totals[agent]
+        total[key] += 1
+        total['moves'] += n_moves
+        total['thinking time'] += thinking_time
+
+        if (agent, opponent) not in self.matchups:
+            self.matchups[(agent, opponent)] = {'win': 0, 'loss': 0, 'draw': 0, 'moves': 0}
+        matchup = self.matchups[(agent, opponent)]
+        matchup[key] += 1
+        matchup['moves'] += n_game_moves
+
+    def add(self, r:caro.GameRecord):
         if r.player_x == r.player_o:
             raise RuntimeError(f"Invalid game record: Agent '{r.player_x}' cannot play against itself")
-    agent_names = set()
-    for r in game_records:
-        agent_names.add(r.player_x)
-        agent_names.add(r.player_o)
-    agent_names = list(agent_names)
-
-    name_to_id = {agent_names[i]:i for i in range(len(agent_names))}
-    statistics = []
-    move_count = [0 for _ in range(len(agent_names))] # use for calculate avg thinking time
-    for n in agent_names:
-        statistics.append({
-            "name": n,
-            "win":  0,
-            "loss": 0,
-            "draw": 0,
-            "avg thinking time": 0
-        })
-
-    matches = dict()
-    for i in range(len(agent_names)):
-        matches[agent_names[i]] = dict()
-        for j in range(len(agent_names)):
-            if i == j:
-                continue
-            matches[agent_names[i]][agent_names[j]] = {
-                "win": 0,
-                "loss": 0,
-                "draw": 0,
-                "avg moves per game": 0
-            }
-
-    def update_matches(agent1:str, agent2:str, result, n_moves):
-        # result agent1 vs agent2: win 1, draw 0, loss -1
-        n_game =  matches[agent1][agent2]['win'] + matches[agent1][agent2]['draw'] +matches[agent1][agent2]['loss']
-        old_avg  = matches[agent1][agent2]['avg moves per game']
-        matches[agent1][agent2]['avg moves per game'] = ((old_avg * n_game) + n_moves)/(n_game + 1)
-        if result == 1:
-            matches[agent1][agent2]['win'] += 1
-        elif result == -1:
-            matches[agent1][agent2]['loss'] += 1
-        elif result == 0:
-            matches[agent1][agent2]['draw'] += 1
-
-    def update_statistics(name, result, n_moves, total_thinking_time):
-        score_id = name_to_id[name]
-
-        # update avg time
-        old_n = move_count[score_id]
-        new_n = old_n + n_moves
-        old_avg = statistics[score_id]['avg thinking time']
-        statistics[score_id]['avg thinking time'] = ((old_avg*old_n)+total_thinking_time)/new_n
-        move_count[score_id] = new_n
-
-        # update result
-        if result == 1:
-            statistics[score_id]['win'] += 1
-        elif result == -1:
-            statistics[score_id]['loss'] += 1
-        elif result == 0:
-            statistics[score_id]['draw'] += 1
-
-    for r in game_records:
+        self._add_agent(r.player_x)
+        self._add_agent(r.player_o)
+
         game_result = r.result()
+        if game_result == caro.NOT_FINISH:
+            self.n_unfinished += 1
+            warnings.warn("There is an unfinished game in game records. This game will be ignored.")
+            return
 
         n_move_0 = len(r.moves)//2
         if (len(r.moves) %2) == 1:
@@ -145,43 +270,76 @@ def analyze_game_record(game_records:list[caro.GameRecord]):
         total_time_1 = sum([r.move_timestamps[i] - r.move_timestamps[i-1] for i in range(1, len(r.moves), 2)])
 
         if r.first_turn == caro.X_PIECE:
-            x_n = n_move_0
-            o_n = n_move_1
-
-            x_t = total_time_0
-            o_t = total_time_1
+            x_n, o_n = n_move_0, n_move_1
+            x_t, o_t = total_time_0, total_time_1
         else:
-            x_n = n_move_1
-            o_n = n_move_0
-
-            x_t = total_time_1
-            o_t = total_time_0
-
-        if game_result == caro.X_WIN:
-            # update matches
-            update_matches(r.player_x, r.player_o, 1, len(r.moves))
-            update_matches(r.player_o, r.player_x, -1, len(r.moves))
-
-            # update statistics
-            update_statistics(r.player_x, 1, x_n, x_t)
-            update_statistics(r.player_o, -1, o_n, o_t)
-        elif game_result == caro.O_WIN:
-            # update matches
-            update_matches(r.player_x, r.player_o, -1, len(r.moves))
-            update_matches(r.player_o, r.player_x, 1, len(r.moves))
-
-            # update statistics
-            update_statistics(r.player_x, -1, x_n, x_t)
-            update_statistics(r.player_o, 1, o_n, o_t)
-        elif game_result == caro.DRAW:
-            # update matches
-            update_matches(r.player_x, r.player_o, 0, len(r.moves))
-            update_matches(r.player_o, r.player_x, 0, len(r.moves))
-
-            # update statistics
-            update_statistics(r.player_x, 0, x_n, x_t)
-            update_statistics(r.player_o, 0, o_n, o_t)
-        elif game_result == caro.NOT_FINISH:
-            warnings.warn("There is an unfinished game in game records. This game will be ignored.")
+            x_n, o_n = n_move_1, n_move_0
+            x_t, o_t = total_time_1, total_time_0
+
+        x_result = 1 if game_result == caro.X_WIN else -1 if game_result == caro.O_WIN else 0
+        self._update(r.player_x, r.player_o, x_result, len(r.moves), x_n, x_t)
+        self._update(r.player_o, r.player_x, -x_result, len(r.moves), o_n, o_t)
+
+    def add_all(self, game_records:Iterable[caro.GameRecord]):
+        for r in game_records:
+            self.add(r)
 
-    return  statistics, matches
\ No newline at end of file
+    def merge(self, other:'RecordAggregator'):
+        """
+        add the statistics of another aggregator to this one
+        """
+        for name in other.agent_names:
+            self._add_agent(name)
+            for k, v in other.totals[name].items():
+                self.totals[name][k] += v
+        for pair, matchup in other.matchups.items():
+            if pair not in self.matchups:
+                self.matchups[pair] = {'win': 0, 'loss': 0, 'draw': 0, 'moves': 0}
+            for k, v in matchup.items():
+                self.matchups[pair][k] += v
+        self.n_unfinished += other.n_unfinished
+
+    def statistics(self)->list[dict[str, Any]]:
+        """
+        :return: list[{name, win, loss, draw, avg thinking time}]
+        """
+        statistics = []
+        for name in self.agent_names:
+            total = self.totals[name]
+            statistics.append({
+                "name": name,
+                "win": total['win'],
+                "loss": total['loss'],
+                "draw": total['draw'],
+                "avg thinking time": total['thinking time'] / total['moves'] if total['moves'] > 0 else 0
+            })
+        return statistics
+
+    def matches(self)->dict[str, dict[str, dict[str, Any]]]:
+        """
+        :return: matches[agent][opponent] = {win, loss, draw, avg moves per game}, for every pair of agents
+        """
+        matches = dict()
+        for agent in self.agent_names:
+            matches[agent] = dict()
+            for opponent in self.agent_names:
+                if agent == opponent:
+                    continue
+                matchup = self.matchups.get((agent, opponent), {'win': 0, 'loss': 0, 'draw': 0, 'moves': 0})
+                n_game = matchup['win'] + matchup['loss'] + matchup['draw']
+                matches[agent][opponent] = {
+                    "win": matchup['win'],
+                    "loss": matchup['loss'],
+                    "draw": matchup['draw'],
+                    "avg moves per game": matchup['moves'] / n_game if n_game > 0 else 0
+                }
+        return matches
+
+def analyze_game_record(game_records:Iterable[caro.GameRecord]):
+    """
+    :param game_records: any iterable of game records, read once
+    :return: tuple(statistics, matches), see RecordAggregator
+    """
+    aggregator = RecordAggregator()
+    aggregator.add_all(game_records)
+    return aggregator.statistics(), aggregator.matches()
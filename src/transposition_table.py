@@ -0,0 +1,76 @@
+# bound type of a stored score
+EXACT = 0
+LOWER_BOUND = 1 # real score >= stored score (search failed high)
+UPPER_BOUND = 2 # real score <= stored score (search failed low)
+
+class TTEntry:
+    __slots__ = ('key', 'depth', 'flag', 'score', 'distance', 'best_move', 'generation')
+
+    def __init__(self, key:int, depth:int, flag:int, score:int|float, distance:int, best_move:tuple[int, int]|None, generation:int):
+        """
+        :param key: full hash key, used to detect index collisions
+        :param depth: remaining search depth of the stored result
+        :param flag: EXACT, LOWER_BOUND or UPPER_BOUND
+        :param score: evaluation
+        :param distance: number of plies from this position to the position that gave the score
+        :param best_move: best move found (or the move that caused the cutoff)
+        :param generation: search generation (see TranspositionTable.new_search)
+        """
+        self.key = key
+        self.depth = depth
+        self.flag = flag
+        self.score = score
+        self.distance = distance
+        self.best_move = best_move
+        self.generation = generation
+
+class TranspositionTable:
+    """
+    Fixed size hash table of search results, indexed by zobrist hash.
+
+    Replacement policy when two positions share a slot:
+        - 'depth': keep the entry searched deeper, unless it comes from an older search
+        - 'always': the new entry always replaces the old one
+    """
+    REPLACEMENT_POLICIES = ('depth', 'always')
+
+    def __init__(self, size:int, replacement_policy:str='depth'):
+        """
+        :param size: number of slots
+        :param replacement_policy: 'depth' or 'always'
+        """
+        if size <= 0:
+            raise RuntimeError("Transposition table size must > 0")
+        if replacement_policy not in TranspositionTable.REPLACEMENT_POLICIES:
+            raise RuntimeError("Replacement policy must be 'depth' or 'always'")
+        self.size = size
+        self.replacement_policy = replacement_policy
+        self.slots = [None for _ in range(size)]
+        self.generation = 0
+
+    def new_search(self):
+        """
+        Call before each search: entries of older searches can be replaced by shallower ones.
+        """
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None for _ in range(self.size)]
+        self.generation = 0
+
+    def get(self, key:int)->TTEntry|None:
+        entry = self.slots[key % self.size]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def put(self, key:int, depth:int, flag:int, score:int|float, distance:int, best_move:tuple[int, int]|None):
+        index = key % self.size
+        old = self.slots[index]
+        if (old is not None) and self.replacement_policy == 'depth' \
+                and old.key != key and old.generation == self.generation and old.depth > depth:
+            return
+        self.slots[index] = TTEntry(key, depth, flag, score, distance, best_move, self.generation)
+
+    def __len__(self):
+        return sum(1 for e in self.slots if e is not None)
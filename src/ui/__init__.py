@@ -4,4 +4,6 @@ from .component import Component
 from .text_box import TextBox
 from .button import Button
 from .board import Board
-from .gif import Gif
\ No newline at end of file
+from .gif import Gif
+from .frame_cache import FrameCache, FRAME_CACHE
+from .render_scheduler import RenderScheduler
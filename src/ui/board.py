@@ -28,6 +28,11 @@ class Board(Component):
         self.line_color = line_color
         self.line_width = line_width if line_width >= 1 else 1
 
+        # retained mode: drawn[row][column] = (piece, color, background) of the cell on the surface,
+        # put() only repaints a cell if this changes
+        self.drawn = [[None for _ in range(self.columns)] for _ in range(self.rows)]
+        self.glyphs = dict() # (piece, color) => rendered text
+
         self.clear()
 
     def cell_detect(self, coordinate:tuple[int, int]|list[int])->tuple[int, int]:
@@ -63,21 +68,25 @@ class Board(Component):
             end = (col * self.cell_size, self.height)
             pygame.draw.line(self.surface, self.line_color, start, end, width=self.line_width if col%5!=0 else (self.line_width*2))
 
+        self.mark_dirty()
+        empty = Board.cell_key("", None, self.background)
+        for row in range(self.rows):
+            for col in range(self.columns):
+                self.drawn[row][col] = empty
 
-    def put(
-            self,
-            piece:str,
-            position:tuple[int, int]|list[int],
-            color: tuple[int, int, int]|tuple[int, int, int, int]|list[int] = (0, 0, 0),
-            background: tuple[int, int, int] | tuple[int, int, int, int] | list[int] = (255, 255,255)
-    ):
+    @staticmethod
+    def cell_key(piece:str, color, background)->tuple:
         """
+        :return: what a cell looks like, blank pieces (e.g. ' ') look the same in every color
+        """
+        if piece.strip() == "":
+            return "", None, tuple(background)
+        return piece, tuple(color), tuple(background)
 
-        :param piece:
+    def cell_rect(self, position:tuple[int, int]|list[int])->tuple[int, int, int, int]:
+        """
         :param position: tuple[row, column]
-        :param color:
-        :param background:
-        :return:
+        :return: (x, y, width, height) of the cell inside the grid lines, on self.surface
         """
         row, column = position
         x = column * self.cell_size + self.line_width
@@ -94,9 +103,46 @@ class Board(Component):
             w -= self.line_width
         if row == self.rows -1:
             h -= self.line_width
+        return x, y, w, h
+
+    def glyph(self, piece:str, color)->pygame.Surface:
+        """
+        :return: piece rendered in color, rendered once then cached
+        """
+        key = (piece, tuple(color))
+        text_rendered = self.glyphs.get(key)
+        if text_rendered is None:
+            text_rendered = self.font.render(piece, True, color)
+            self.glyphs[key] = text_rendered
+        return text_rendered
 
-        text_rendered = self.font.render(piece, True, color)
-        align = utils.get_center_offset(outer_size=(w, h), inner_size=text_rendered.get_size())
+    def put(
+            self,
+            piece:str,
+            position:tuple[int, int]|list[int],
+            color: tuple[int, int, int]|tuple[int, int, int, int]|list[int] = (0, 0, 0),
+            background: tuple[int, int, int] | tuple[int, int, int, int] | list[int] = (255, 255,255)
+    )->bool:
+        """
+        Draw piece in the cell, nothing is done if the cell already looks like this.
+
+        :param piece:
+        :param position: tuple[row, column]
+        :param color:
+        :param background:
+        :return: True if the cell was repainted
+        """
+        row, column = position
+        key = Board.cell_key(piece, color, background)
+        if self.drawn[row][column] == key:
+            return False
+        self.drawn[row][column] = key
 
+        x, y, w, h = self.cell_rect(position)
         pygame.draw.rect(self.surface, background, (x, y, w, h))
-        self.surface.blit(text_rendered, (x + align[0], y + align[1]))
\ No newline at end of file
+        if key[0] != "":
+            text_rendered = self.glyph(piece, color)
+            align = utils.get_center_offset(outer_size=(w, h), inner_size=text_rendered.get_size())
+            self.surface.blit(text_rendered, (x + align[0], y + align[1]))
+        self.mark_dirty()
+        return True
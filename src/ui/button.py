@@ -39,6 +39,7 @@ class Button(Component):
         else:
 
             utils.blit_centered(outer_surface=self.surface, inner_surface= utils.scale_surface_to_fit(self.label, (self.width, self.height)))
+        self.mark_dirty()
 
     def handle_event(self, e:pygame.event.Event):
         super().handle_event(e)
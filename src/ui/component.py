@@ -21,6 +21,24 @@ class Component:
         self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         self.outer_surface = outer_surface if outer_surface is not None else pygame.display.get_surface()
         self.event_handlers = []
+        # True => surface changed since the last render (see RenderScheduler)
+        self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def animate(self, now:int):
+        """
+        Update the surface for the time now (milliseconds, pygame.time.get_ticks()), call mark_dirty() if it changed.
+        Static components do nothing.
+        """
+        pass
+
+    def next_frame_at(self, now:int)->int|None:
+        """
+        :return: time (milliseconds) of the next change made by animate(), None => static component
+        """
+        return None
 
     def rect(self)->tuple[int, int, int, int]:
         return self.x, self.y, self.width, self.height
@@ -0,0 +1,112 @@
+import os
+import hashlib
+import struct
+import tempfile
+from collections import OrderedDict
+import pygame
+from . import utils
+
+FRAME_CACHE_VERSION = 1
+
+class FrameCache:
+    """
+    Decoded GIF frames, scaled to fit a size, keyed by (gif path, size).
+    The least recently used entries are dropped when the frames take more than max_bytes.
+
+    If cache_dir is not None, the scaled frames are also saved there as raw RGBA data,
+    so the next runs do not have to decode and scale the GIF again.
+
+    Example:
+        frames = FRAME_CACHE.get(gif_path, (width, height))  # decoded once, then a dict lookup
+    """
+    def __init__(self, max_bytes:int=64 * 1024 * 1024, cache_dir:str|None=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict() # (path, size) => list of frames, least recently used first
+        self.n_bytes = 0
+
+    @staticmethod
+    def size_of(frames:list[pygame.Surface])->int:
+        """
+        :return: memory used by the frames (4 bytes per pixel)
+        """
+        return sum(4 * f.get_width() * f.get_height() for f in frames)
+
+    def get(self, path:str, size:tuple[int, int]|list[int])->list[pygame.Surface]:
+        """
+        :param size: (max width, max height), frames keep their aspect ratio (see utils.scale_surface_to_fit)
+        :return: frames, shared with other users of the cache => do not draw on them
+        """
+        key = (os.path.abspath(path), (size[0], size[1]))
+        frames = self.entries.get(key)
+        if frames is not None:
+            self.entries.move_to_end(key)
+            return frames
+
+        frames = self._read_file(key)
+        if frames is None:
+            frames = [utils.scale_surface_to_fit(f, key[1]) for f in utils.gif_to_surfaces(path)]
+            self._write_file(key, frames)
+
+        self.entries[key] = frames
+        self.n_bytes += FrameCache.size_of(frames)
+        while self.n_bytes > self.max_bytes and len(self.entries) > 1:
+            _, old_frames = self.entries.popitem(last=False)
+            self.n_bytes -= FrameCache.size_of(old_frames)
+        return frames
+
+    def clear(self):
+        """
+        Remove all frames from memory (files in cache_dir are kept)
+        """
+        self.entries.clear()
+        self.n_bytes = 0
+
+    def _file_path(self, key:tuple[str, tuple[int, int]])->str:
+        # the modification time is part of the name => an edited GIF gets a new file
+        path, size = key
+        name = f"{path}|{os.path.getmtime(path)}|{size[0]}x{size[1]}|{FRAME_CACHE_VERSION}"
+        return os.path.join(self.cache_dir, hashlib.sha1(name.encode('utf-8')).hexdigest() + '.frames')
+
+    def _read_file(self, key:tuple[str, tuple[int, int]])->list[pygame.Surface] | None:
+        """
+        File: number of frames, then for each frame: width, height (uint32) and the RGBA pixels
+        """
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._file_path(key), 'rb') as file:
+                data = file.read()
+            n_frames = struct.unpack_from('<I', data, 0)[0]
+            offset = 4
+            frames = []
+            for _ in range(n_frames):
+                width, height = struct.unpack_from('<II', data, offset)
+                offset += 8
+                n = 4 * width * height
+                frames.append(pygame.image.fromstring(data[offset:offset + n], (width, height), 'RGBA'))
+                offset += n
+            return frames
+        except (OSError, struct.error, ValueError):
+            return None
+
+    def _write_file(self, key:tuple[str, tuple[int, int]], frames:list[pygame.Surface]):
+        if self.cache_dir is None:
+            return
+        # written to a temporary file, then renamed: a crash or another instance never leaves a partial file
+        temp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as file:
+                file.write(struct.pack('<I', len(frames)))
+                for f in frames:
+                    file.write(struct.pack('<II', f.get_width(), f.get_height()))
+                    file.write(pygame.image.tostring(f, 'RGBA'))
+            os.replace(temp_path, self._file_path(key))
+        except OSError:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+# cache shared by all components
+FRAME_CACHE = FrameCache()
@@ -2,6 +2,9 @@ import pygame
 from .component import Component
 from . import utils
 
+# frame_delay is counted in ticks of 1/TICK_RATE second
+TICK_RATE = 60
+
 class Gif(Component):
     def __init__(
             self,
@@ -14,13 +17,15 @@ class Gif(Component):
 
         :param rect: (x, y, width, height)
         :param frames:  A list of surfaces representing each frame of the animation.
-        :param frame_delay: Number of render cycles to wait before switching to the next frame.
+        :param frame_delay: Time each frame is shown, in ticks of 1/60 second (TICK_RATE).
+            Frames follow the clock, not the number of render calls.
         :param outer_surface:
         """
         super().__init__(rect, outer_surface)
         self.frames = [utils.scale_surface_to_fit(f, (self.width, self.height)) for f in frames]
         self.frame_delay = frame_delay
-        self.count = 0
+        self.frame_time = max(1, frame_delay * 1000 // TICK_RATE) # milliseconds
+        self.start_time = pygame.time.get_ticks()
         self.current_frame = 0
 
         self.draw_frame()
@@ -28,11 +33,15 @@ class Gif(Component):
     def draw_frame(self):
         self.surface.fill((0, 0, 0, 0))
         self.surface.blit(self.frames[self.current_frame], (0, 0))
+        self.mark_dirty()
 
-    def render(self):
-        self.count += 1
-        if self.count == self.frame_delay:
-            self.count = 0
-            self.current_frame = (self.current_frame+1) % len(self.frames)
+    def animate(self, now:int):
+        frame = ((now - self.start_time) // self.frame_time) % len(self.frames)
+        if frame != self.current_frame:
+            self.current_frame = frame
             self.draw_frame()
-        super().render()
+
+    def next_frame_at(self, now:int)->int|None:
+        if len(self.frames) <= 1:
+            return None
+        return self.start_time + ((now - self.start_time) // self.frame_time + 1) * self.frame_time
@@ -0,0 +1,99 @@
+import pygame
+from .component import Component
+
+class RenderScheduler:
+    """
+    Redraw only the components that changed, and sleep while nothing changes.
+
+    A component is redrawn when its dirty flag is set (see Component.mark_dirty) or when its animate()
+    changes it. The screen region of the component is cleared and every component in it is rendered
+    again, so components with transparent backgrounds are drawn correctly.
+
+    Example:
+        scheduler = RenderScheduler(components, background=WHITE)
+        while running:
+            for event in scheduler.wait_events():  # blocks while idle
+                ...
+            scheduler.draw()
+    """
+    def __init__(
+            self,
+            components:list[Component],
+            background:tuple[int, int, int]|tuple[int, int, int, int]|list[int]=(255, 255, 255),
+            max_wait:int=1000,
+            surface:pygame.Surface|None=None
+    ):
+        """
+        :param components: components on the screen, rendered in this order
+        :param background: color of the screen behind the components
+        :param max_wait: longest time (milliseconds) wait_events() blocks
+        :param surface: if None, surface = pygame.display.get_surface()
+        """
+        self.components = list(components)
+        self.background = background
+        self.max_wait = max_wait if max_wait >= 0 else 0
+        self.surface = surface if surface is not None else pygame.display.get_surface()
+        self.redraw_all = True # first draw() repaints the whole screen
+
+    def invalidate(self):
+        """
+        Repaint the whole screen on the next draw()
+        """
+        self.redraw_all = True
+
+    def is_dirty(self)->bool:
+        return self.redraw_all or any(c.dirty for c in self.components)
+
+    def draw(self)->list[pygame.Rect]:
+        """
+        Animate the components, then redraw and update the changed regions of the display.
+        :return: updated regions, [] => nothing changed
+        """
+        now = pygame.time.get_ticks()
+        for c in self.components:
+            c.animate(now)
+
+        if self.redraw_all:
+            rects = [self.surface.get_rect()]
+        else:
+            rects = [pygame.Rect(c.rect()) for c in self.components if c.dirty]
+        if len(rects) == 0:
+            return rects
+
+        for rect in rects:
+            self.surface.set_clip(rect)
+            self.surface.fill(self.background, rect)
+            for c in self.components:
+                if rect.colliderect(c.rect()):
+                    c.render()
+        self.surface.set_clip(None)
+
+        for c in self.components:
+            c.dirty = False
+        self.redraw_all = False
+        pygame.display.update(rects)
+        return rects
+
+    def wait_events(self)->list[pygame.event.Event]:
+        """
+        Get the waiting events. If there are none and nothing has to be redrawn, block until an event comes,
+        the next animation frame is due or max_wait milliseconds pass.
+        Events posted by other threads (pygame.event.post) also end the wait.
+        """
+        events = pygame.event.get()
+        if len(events) != 0 or self.is_dirty():
+            return events
+
+        now = pygame.time.get_ticks()
+        timeout = self.max_wait
+        for c in self.components:
+            t = c.next_frame_at(now)
+            if t is not None:
+                timeout = min(timeout, t - now)
+        if timeout <= 0:
+            return events
+
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
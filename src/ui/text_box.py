@@ -49,5 +49,6 @@ class TextBox(Component):
         if align is None:
             align = utils.get_center_offset(self.surface.get_size(), text_rendered.get_size())
         self.surface.blit(text_rendered, align)
+        self.mark_dirty()
 
 
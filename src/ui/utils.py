@@ -27,6 +27,9 @@ def scale_surface_to_fit(surface: pygame.Surface, max_size: tuple[int, int]) ->
 
     new_width = int(original_width * scale)
     new_height = int(original_height * scale)
+    # already fits (e.g. frames from the frame cache) => nothing to scale
+    if new_width == original_width and new_height == original_height:
+        return surface
 
     return pygame.transform.smoothscale(surface, (new_width, new_height))
 